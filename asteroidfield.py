@@ -1,10 +1,11 @@
 import pygame
-import random
 from asteroid import Asteroid
 from constants import *
+from rng import default_rng
 
 
 class AsteroidField(pygame.sprite.Sprite):
+    system = "spawner"
     edges = [
         [
             pygame.Vector2(1, 0),
@@ -28,38 +29,87 @@ class AsteroidField(pygame.sprite.Sprite):
         ],
     ]
 
-    def __init__(self):
-        pygame.sprite.Sprite.__init__(self, self.containers)
+    def __init__(self, asteroids=None, wrap=ASTEROID_WRAP, max_asteroids=ASTEROID_MAX_COUNT, asteroid_class=Asteroid,
+                 rng=None):
+        pygame.sprite.Sprite.__init__(self)
+        self.rng = rng or default_rng
         self.spawn_timer = 0.0
         self.base_speed = 40  # Minimum speed
         self.max_speed = 100  # Maximum speed
+        # Difficulty curve, see current spawn rate and speed in update
+        self.spawn_rate = ASTEROID_SPAWN_RATE
+        self.spawn_rate_decay = ASTEROID_SPAWN_RATE_DECAY
+        self.min_spawn_rate = ASTEROID_MIN_SPAWN_RATE
+        self.speed_growth = ASTEROID_SPEED_GROWTH
+        self.asteroids = asteroids  # group the field manages the lifetime of
+        self.wrap = wrap
+        self.max_asteroids = max_asteroids
+        self.culled = 0  # asteroids retired after leaving the play area
+        self.asteroid_class = asteroid_class
+
+    def cull(self):
+        # Asteroids spawn just outside the screen, ASTEROID_MAX_RADIUS past the
+        # edge. Once one is beyond that margin and still moving outward it can
+        # never come back, so retire it (or wrap it to the opposite side).
+        if self.asteroids is None:
+            return
+        margin = ASTEROID_MAX_RADIUS
+        left, right = -margin, SCREEN_WIDTH + margin
+        top, bottom = -margin, SCREEN_HEIGHT + margin
+        if hasattr(self.asteroids, "cull"):
+            # The array engine culls the whole store in one vectorized pass
+            self.culled += self.asteroids.cull(left, top, right, bottom, self.wrap)
+            return
+        for asteroid in self.asteroids:
+            position = asteroid.position
+            velocity = asteroid.velocity
+            out_x = (position.x < left and velocity.x < 0) or (position.x > right and velocity.x > 0)
+            out_y = (position.y < top and velocity.y < 0) or (position.y > bottom and velocity.y > 0)
+            if not (out_x or out_y):
+                continue
+            if not self.wrap:
+                asteroid.kill()
+                self.culled += 1
+                continue
+            if out_x:
+                position.x += (right - left) if velocity.x < 0 else (left - right)
+            if out_y:
+                position.y += (bottom - top) if velocity.y < 0 else (top - bottom)
 
     def spawn(self, radius, position, velocity, speed_multiplier=1.0):
-        asteroid = Asteroid(position.x, position.y, radius)
+        asteroid = self.asteroid_class.create(position.x, position.y, radius, self.rng)
         asteroid.velocity = velocity * speed_multiplier
 
     def update(self, dt, level):
         # Calculate spawn rate based on level (decreases by 10% per level, minimum 0.2 seconds)
-        current_spawn_rate = max(ASTEROID_SPAWN_RATE * (0.9 ** (level - 1)), 0.2)
+        current_spawn_rate = max(self.spawn_rate * (self.spawn_rate_decay ** (level - 1)), self.min_spawn_rate)
         
+        self.cull()
+
         self.spawn_timer += dt
         if self.spawn_timer > current_spawn_rate:
             self.spawn_timer = 0
 
+            # Skip this spawn while the field is at its live asteroid cap
+            if self.asteroids is not None and len(self.asteroids) >= self.max_asteroids:
+                return
+
             # spawn a new asteroid at a random edge
-            edge = random.choice(self.edges)
+            rng = self.rng.sim
+            edge = rng.choice(self.edges)
             
             # Adjust base speed range based on level (more gradual increase)
-            level_speed_multiplier = 1.1 ** (level - 1)  # 10% increase per level instead of 20%
+            level_speed_multiplier = self.speed_growth ** (level - 1)  # 10% increase per level instead of 20%
             adjusted_base_speed = self.base_speed * level_speed_multiplier
             adjusted_max_speed = self.max_speed * level_speed_multiplier
             
             # Cap the maximum speed to prevent asteroids from becoming too fast
             adjusted_max_speed = min(adjusted_max_speed, 200)  # Cap at 200 units per second
+            adjusted_base_speed = min(adjusted_base_speed, adjusted_max_speed)  # keep the range valid at high levels
             
-            speed = random.randint(int(adjusted_base_speed), int(adjusted_max_speed))
+            speed = rng.randint(int(adjusted_base_speed), int(adjusted_max_speed))
             velocity = edge[0] * speed
-            velocity = velocity.rotate(random.randint(-30, 30))
-            position = edge[1](random.uniform(0, 1))
-            kind = random.randint(1, ASTEROID_KINDS)
+            velocity = velocity.rotate(rng.randint(-30, 30))
+            position = edge[1](rng.uniform(0, 1))
+            kind = rng.randint(1, ASTEROID_KINDS)
             self.spawn(ASTEROID_MIN_RADIUS * kind, position, velocity, 1.0)  # Remove the second speed multiplier
\ No newline at end of file
@@ -0,0 +1,394 @@
+import pygame
+from rng import default_rng
+from shapes import default_library, MAX_VERTICES
+from circleshape import INTERPOLATION_SNAP_DISTANCE, swept_start
+from constants import ASTEROID_MIN_RADIUS
+
+try:
+    import numpy as np
+except ImportError:  # the array engine is optional
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Per-asteroid arrays, all indexed by row
+FIELDS = ("position", "previous_position", "velocity", "radius", "rotation", "rotation_speed", "shape_id")
+
+
+# Array-backed asteroid engine. Every asteroid lives in one row of a set of
+# contiguous NumPy arrays so movement, collision and splitting are done for
+# the whole field at once. The store is moved and drawn by its own system
+# (world.ArrayAsteroidSystem); ArrayAsteroid handles stand in for individual
+# asteroids wherever the rest of the game expects a sprite.
+class AsteroidStore(pygame.sprite.Sprite):
+    def __init__(self, rng=None, sprite_cache=None, capacity=256, shapes=default_library):
+        if np is None:
+            raise RuntimeError("the array asteroid engine requires numpy")
+        super().__init__()
+        self.rng = rng or default_rng
+        self.sprite_cache = sprite_cache  # AsteroidSpriteCache, None draws exact polygons
+        self.shapes = shapes  # ShapeLibrary, each row keeps the id of its outline
+        self.outlines = None  # the library's outlines as arrays, see _outlines
+        self.count = 0
+        self.handles = []
+        self.position = np.zeros((capacity, 2))
+        self.previous_position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity)
+        self.rotation = np.zeros(capacity)
+        self.rotation_speed = np.zeros(capacity)
+        self.shape_id = np.zeros(capacity, dtype=np.intp)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, extra):
+        capacity = len(self.radius)
+        needed = self.count + extra
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in FIELDS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def append(self, positions, velocities, radii, handles=None):
+        # Adds a batch of asteroids and returns their handles. New handles are
+        # created unless the caller supplies its own.
+        k = len(radii)
+        if k == 0:
+            return []
+        self._reserve(k)
+        start, end = self.count, self.count + k
+        self.position[start:end] = positions
+        self.previous_position[start:end] = positions
+        self.velocity[start:end] = velocities
+        self.radius[start:end] = radii
+        fx = self.rng.fx
+        self.rotation[start:end] = [fx.uniform(0, 360) for _ in range(k)]
+        self.rotation_speed[start:end] = [fx.uniform(-30, 30) for _ in range(k)]
+        pick = self.shapes.pick
+        self.shape_id[start:end] = [pick(radius, self.rng) for radius in self.radius[start:end].tolist()]
+        self.count = end
+
+        if handles is None:
+            handles = [ArrayAsteroid.__new__(ArrayAsteroid) for _ in range(k)]
+        for row, handle in zip(range(start, end), handles):
+            handle._attach(self, row)
+        self.handles.extend(handles)
+        return handles
+
+    def remove(self, row):
+        # Swap-remove a single asteroid, O(1)
+        last = self.count - 1
+        handle = self.handles[row]
+        if row != last:
+            for name in FIELDS:
+                array = getattr(self, name)
+                array[row] = array[last]
+            moved = self.handles[last]
+            moved.index = row
+            self.handles[row] = moved
+        self.handles.pop()
+        self.count = last
+        handle.index = -1
+        return handle
+
+    def compact(self, rows):
+        # Batched removal: drop every row in `rows` and close the gaps while
+        # keeping the remaining asteroids in order
+        if len(rows) == 0:
+            return []
+        keep = np.ones(self.count, dtype=bool)
+        keep[rows] = False
+        removed = [self.handles[row] for row in np.flatnonzero(~keep)]
+        remaining = int(keep.sum())
+        for name in FIELDS:
+            array = getattr(self, name)
+            array[:remaining] = array[:self.count][keep]
+        self.handles = [handle for handle, kept in zip(self.handles, keep) if kept]
+        for row, handle in enumerate(self.handles):
+            handle.index = row
+        for handle in removed:
+            handle.index = -1
+        self.count = remaining
+        return removed
+
+    def update(self, dt):
+        n = self.count
+        self.previous_position[:n] = self.position[:n]
+        self.position[:n] += self.velocity[:n] * dt
+        self.rotation[:n] += self.rotation_speed[:n] * dt
+
+    def cull(self, left, top, right, bottom, wrap):
+        # Vectorized version of AsteroidField.cull, returns how many asteroids
+        # were retired
+        n = self.count
+        x, y = self.position[:n, 0], self.position[:n, 1]
+        vx, vy = self.velocity[:n, 0], self.velocity[:n, 1]
+        out_left = (x < left) & (vx < 0)
+        out_right = (x > right) & (vx > 0)
+        out_top = (y < top) & (vy < 0)
+        out_bottom = (y > bottom) & (vy > 0)
+        if wrap:
+            x[out_left] += right - left
+            x[out_right] -= right - left
+            y[out_top] += bottom - top
+            y[out_bottom] -= bottom - top
+            return 0
+        rows = np.flatnonzero(out_left | out_right | out_top | out_bottom)
+        for handle in self.compact(rows):
+            handle.kill()
+        return len(rows)
+
+    def _swept(self):
+        # Where each asteroid's movement over the last step started and how
+        # far it went, with wrapped or bounced asteroids starting at their
+        # new position
+        n = self.count
+        position, previous = self.position[:n], self.previous_position[:n]
+        delta = position - previous
+        moved_sq = delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]
+        jumped = moved_sq > INTERPOLATION_SNAP_DISTANCE ** 2
+        if jumped.any():
+            moved_sq[jumped] = 0.0
+            previous = np.where(jumped[:, None], position, previous)
+        return previous, np.sqrt(moved_sq)
+
+    def _impacts(self, start, end, radius):
+        # Vectorized circleshape.time_of_impact of every asteroid against
+        # movers given by their start and end positions over the last step.
+        # Returns (asteroid rows, mover columns, times) for every pair that
+        # touched.
+        n = self.count
+        asteroid_start, asteroid_moved = self._swept()
+        asteroid_end = self.position[:n]
+        mover_moved = np.sqrt(np.einsum("ij,ij->i", end - start, end - start))
+
+        # Pairs further apart at the end of the step than their radii plus
+        # both movements can't have touched; only the rest get the exact test
+        dx = asteroid_end[:, 0, None] - end[None, :, 0]
+        dy = asteroid_end[:, 1, None] - end[None, :, 1]
+        limit = self.radius[:n, None] + asteroid_moved[:, None] + (radius + mover_moved)[None, :]
+        rows, columns = np.nonzero(dx * dx + dy * dy <= limit * limit)
+        if len(rows) == 0:
+            return rows, columns, np.zeros(0)
+
+        offset = asteroid_start[rows] - start[columns]
+        movement = (asteroid_end[rows] - end[columns]) - offset
+        reach = self.radius[rows] + radius[columns]
+        c = np.einsum("ij,ij->i", offset, offset) - reach * reach
+        half_b = np.einsum("ij,ij->i", offset, movement)
+        a = np.einsum("ij,ij->i", movement, movement)
+        discriminant = half_b * half_b - a * c
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (-half_b - np.sqrt(discriminant)) / a
+        touching = c <= 0  # already touching at the start of the step
+        hit = touching | ((half_b < 0) & (discriminant >= 0) & (t <= 1.0))
+        t = np.where(touching, 0.0, t)
+        return rows[hit], columns[hit], t[hit]
+
+    def collide_shots(self, shots):
+        # Returns (asteroid rows, shots) for every hit over the last step.
+        # Contacts are resolved in time of impact order, as in the sprite
+        # path: each shot hits the first asteroid it reached and each asteroid
+        # is destroyed by the first shot to reach it.
+        n = self.count
+        shots = list(shots)
+        if n == 0 or not shots:
+            return np.zeros(0, dtype=np.intp), []
+        start = np.array([tuple(swept_start(shot)) for shot in shots])
+        end = np.array([(shot.position.x, shot.position.y) for shot in shots])
+        radius = np.array([shot.radius for shot in shots])
+        rows, columns, t = self._impacts(start, end, radius)
+        order = np.lexsort((columns, rows, t))
+        hit_rows, hit_shots = [], []
+        used_rows, used_shots = set(), set()
+        for row, column in zip(rows[order].tolist(), columns[order].tolist()):
+            if row in used_rows or column in used_shots:
+                continue
+            used_rows.add(row)
+            used_shots.add(column)
+            hit_rows.append(row)
+            hit_shots.append(shots[column])
+        return np.array(hit_rows, dtype=np.intp), hit_shots
+
+    def impacts(self, other):
+        # (time of impact, handle) for every asteroid a moving circle such as
+        # the player touched over the last step, earliest first
+        if self.count == 0:
+            return []
+        start = np.array([tuple(swept_start(other))])
+        end = np.array([(other.position.x, other.position.y)])
+        rows, _, t = self._impacts(start, end, np.array([other.radius]))
+        order = np.argsort(t, kind="stable")
+        return [(float(t[i]), self.handles[rows[i]]) for i in order]
+
+    def nearest(self, position, max_distance):
+        # Handle of the closest asteroid within max_distance, or None
+        n = self.count
+        if n == 0:
+            return None
+        delta = self.position[:n] - (position.x, position.y)
+        distance_sq = np.einsum("ij,ij->i", delta, delta)
+        row = int(distance_sq.argmin())
+        if distance_sq[row] > max_distance * max_distance:
+            return None
+        return self.handles[row]
+
+    def split(self, rows):
+        # Batched Asteroid.split: every hit spawns an explosion, asteroids
+        # above the minimum size are replaced by two faster children
+        rows = np.asarray(rows, dtype=np.intp)
+        if len(rows) == 0:
+            return
+        world = ArrayAsteroid.world
+        if world is not None:
+            for (x, y), radius in zip(self.position[rows].tolist(), self.radius[rows].tolist()):
+                world.explode((x, y), radius, self.rng)
+
+        parents = rows[self.radius[rows] > ASTEROID_MIN_RADIUS]
+        k = len(parents)
+        angles = np.radians([self.rng.sim.uniform(20, 50) for _ in range(k)])
+        cos, sin = np.cos(angles), np.sin(angles)
+        vx, vy = self.velocity[parents, 0], self.velocity[parents, 1]
+        velocity1 = np.stack((vx * cos - vy * sin, vx * sin + vy * cos), axis=1) * 1.2
+        velocity2 = np.stack((vx * cos + vy * sin, -vx * sin + vy * cos), axis=1) * 1.2
+        positions = np.repeat(self.position[parents], 2, axis=0)
+        velocities = np.empty((2 * k, 2))
+        velocities[0::2] = velocity1
+        velocities[1::2] = velocity2
+        radii = np.repeat(self.radius[parents] - ASTEROID_MIN_RADIUS, 2)
+
+        for handle in self.compact(np.unique(rows)):
+            handle.kill()
+        for handle in self.append(positions, velocities, radii):
+            if world is not None:
+                world.add(handle)
+
+    def draw(self, canvas, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return
+        position = self.position[:n]
+        if alpha < 1.0:
+            # Interpolate between the last two steps, snapping wrapped or
+            # bounced asteroids to their new position
+            previous = self.previous_position[:n]
+            delta = position - previous
+            jumped = np.einsum("ij,ij->i", delta, delta) > INTERPOLATION_SNAP_DISTANCE ** 2
+            position = np.where(jumped[:, None], position, previous + delta * alpha)
+        if self.sprite_cache is not None:
+            cache = self.sprite_cache
+            shapes = self.shapes.shapes
+            rows = zip(position.tolist(), self.shape_id[:n].tolist(), self.rotation[:n].tolist())
+            for (x, y), shape_id, rotation in rows:
+                cache.draw(canvas, shape_id, shapes[shape_id], rotation, x, y)
+            return
+
+        vertices, vertex_count = self._outlines()
+        shape_id = self.shape_id[:n]
+        angle = np.radians(self.rotation[:n])
+        cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+        local_x, local_y = vertices[shape_id, :, 0], vertices[shape_id, :, 1]
+        world = np.empty((n, MAX_VERTICES, 2))
+        world[:, :, 0] = local_x * cos - local_y * sin + position[:, None, 0]
+        world[:, :, 1] = local_x * sin + local_y * cos + position[:, None, 1]
+        outline = canvas.outline
+        for points, count in zip(world.tolist(), vertex_count[shape_id].tolist()):
+            outline(points[:count])
+
+    def _outlines(self):
+        # (vertices padded to MAX_VERTICES, vertex counts) of every outline
+        # in the library, by shape id, rebuilt if the library has grown
+        shapes = self.shapes.shapes
+        if self.outlines is None or len(self.outlines[1]) != len(shapes):
+            vertices = np.zeros((len(shapes), MAX_VERTICES, 2))
+            for shape_id, outline in enumerate(shapes):
+                vertices[shape_id, :len(outline)] = outline
+            self.outlines = vertices, np.array([len(outline) for outline in shapes], dtype=np.intp)
+        return self.outlines
+
+    def kill(self):
+        for handle in self.handles:
+            handle.index = -1
+            handle.kill()
+        self.handles = []
+        self.count = 0
+        super().kill()
+
+
+# Thin sprite-like handle onto one row of an AsteroidStore, so code written
+# against Asteroid (AsteroidField.spawn, tracking shots, clear_asteroids)
+# keeps working with the array engine.
+class ArrayAsteroid(pygame.sprite.Sprite):
+    system = "asteroids"
+    world = None  # World new asteroids register with, set by World.bind
+    store = None
+    generation = 0  # handles are never recycled, a killed one stays dead
+
+    def __init__(self, x, y, radius, rng=None):
+        # rng is accepted for Asteroid compatibility, the store's is used
+        self.store.append([(x, y)], [(0, 0)], [radius], [self])
+        if self.world is not None:
+            self.world.add(self)
+
+    @classmethod
+    def create(cls, x, y, radius, rng=None):
+        # Same construction interface as the pooled Asteroid
+        return cls(x, y, radius, rng)
+
+    def _attach(self, store, index):
+        pygame.sprite.Sprite.__init__(self)
+        self.store = store
+        self.index = index
+
+    @property
+    def position(self):
+        return pygame.Vector2(*self.store.position[self.index])
+
+    @position.setter
+    def position(self, value):
+        self.store.position[self.index] = (value[0], value[1])
+
+    @property
+    def previous_position(self):
+        return pygame.Vector2(*self.store.previous_position[self.index])
+
+    @previous_position.setter
+    def previous_position(self, value):
+        self.store.previous_position[self.index] = (value[0], value[1])
+
+    @property
+    def velocity(self):
+        return pygame.Vector2(*self.store.velocity[self.index])
+
+    @velocity.setter
+    def velocity(self, value):
+        self.store.velocity[self.index] = (value[0], value[1])
+
+    @property
+    def radius(self):
+        return float(self.store.radius[self.index])
+
+    @property
+    def rotation(self):
+        return float(self.store.rotation[self.index])
+
+    @property
+    def vertices(self):
+        return self.store.shapes.shapes[int(self.store.shape_id[self.index])]
+
+    def collision(self, other):
+        return self.position.distance_to(other.position) <= self.radius + other.radius
+
+    def split(self):
+        self.store.split([self.index])
+
+    def kill(self):
+        if self.index >= 0:
+            self.store.remove(self.index)
+        super().kill()
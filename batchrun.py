@@ -0,0 +1,155 @@
+# Plays many headless games at once across every core, for tuning the
+# difficulty curve. Each session is one game with its own seed, played by a
+# script or the aiming bot until game over or the tick limit. Workers send
+# back one small result tuple per session, never game objects, and the
+# results are aggregated into a single report as they arrive.
+#
+#   python batchrun.py --sessions 2000 --input bot
+#   python batchrun.py --speed-growth 1.15 --output sessions.jsonl
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from constants import (SIMULATION_TICK_RATE, ASTEROID_SPAWN_RATE, ASTEROID_SPAWN_RATE_DECAY,
+                       ASTEROID_MIN_SPAWN_RATE, ASTEROID_SPEED_GROWTH)
+
+# Fields of a session result, in order
+FIELDS = ("seed", "level", "score", "ticks", "game_over", "peak_asteroids", "peak_shots", "ticks_per_sec")
+
+
+def make_input(name):
+    from controls import ScriptedInput, AimBot, autopilot
+    if name == "bot":
+        return AimBot()
+    return ScriptedInput(autopilot)
+
+
+def run_session(task):
+    # Runs in a worker process; returns a tuple of FIELDS
+    seed, settings = task
+    from main import Game
+    source = make_input(settings["input"])
+    game = Game(array_asteroids=settings["array_asteroids"], tick_rate=settings["tick_rate"], seed=seed,
+                headless=True, input_source=source)
+    source.game = game
+    game.start_game()
+    field = game.asteroid_field
+    field.spawn_rate = settings["spawn_rate"]
+    field.spawn_rate_decay = settings["spawn_rate_decay"]
+    field.min_spawn_rate = settings["min_spawn_rate"]
+    field.speed_growth = settings["speed_growth"]
+
+    asteroids, shots = game.asteroids, game.shots
+    peak_asteroids = peak_shots = 0
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < settings["ticks"] and not game.game_over:
+        game.step(game.step_dt)
+        ticks += 1
+        if len(asteroids) > peak_asteroids:
+            peak_asteroids = len(asteroids)
+        if len(shots) > peak_shots:
+            peak_shots = len(shots)
+    elapsed = time.perf_counter() - start
+    game.world.clear()
+    return (seed, game.level, game.score, ticks, game.game_over, peak_asteroids, peak_shots,
+            ticks / elapsed if elapsed else 0.0)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Report:
+    # Running aggregate of session results
+    def __init__(self):
+        self.results = []
+        self.levels = {}  # level reached -> sessions
+
+    def add(self, result):
+        self.results.append(result)
+        level = result[FIELDS.index("level")]
+        self.levels[level] = self.levels.get(level, 0) + 1
+
+    def print(self, elapsed, tick_rate):
+        n = len(self.results)
+        if n == 0:
+            print("no sessions played")
+            return
+        ticks, game_over = FIELDS.index("ticks"), FIELDS.index("game_over")
+        finished = sorted(result[ticks] for result in self.results if result[game_over])
+        print(f"{n} sessions in {elapsed:.1f}s, "
+              f"{sum(result[ticks] for result in self.results) / elapsed:.0f} ticks/sec across all workers")
+        print(f"game over in {len(finished)} of {n}")
+        print(f"{'':<16}{'mean':>10}{'p10':>10}{'p50':>10}{'p90':>10}{'max':>10}")
+        for name in ("level", "score", "ticks", "peak_asteroids", "peak_shots", "ticks_per_sec"):
+            values = sorted(result[FIELDS.index(name)] for result in self.results)
+            print(f"{name:<16}{sum(values) / n:>10.1f}{percentile(values, 0.1):>10.0f}"
+                  f"{percentile(values, 0.5):>10.0f}{percentile(values, 0.9):>10.0f}{values[-1]:>10.0f}")
+        # Sessions still going at the tick limit say nothing about how long
+        # a player lasts, so survival only counts the games that ended
+        if finished:
+            print(f"median survival {percentile(finished, 0.5) / tick_rate:.1f}s "
+                  f"over the {len(finished)} games that ended")
+        else:
+            print("median survival unknown, no game ended within the tick limit")
+        print("level reached: " + "  ".join(f"{level}: {count}" for level, count in sorted(self.levels.items())))
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games in parallel")
+    parser.add_argument("--sessions", type=int, default=1000, help="games to play")
+    parser.add_argument("--ticks", type=int, default=SIMULATION_TICK_RATE * 300,
+                        help="most simulation steps per game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest count up from it")
+    parser.add_argument("--input", choices=("autopilot", "bot"), default="autopilot",
+                        help="who plays: the spinning autopilot script or the aiming bot")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--tick-rate", type=int, default=SIMULATION_TICK_RATE,
+                        help="simulation steps per second")
+    parser.add_argument("--array-asteroids", action="store_true", help="use the NumPy asteroid engine")
+    parser.add_argument("--spawn-rate", type=float, default=ASTEROID_SPAWN_RATE,
+                        help="seconds between spawns at level 1")
+    parser.add_argument("--spawn-rate-decay", type=float, default=ASTEROID_SPAWN_RATE_DECAY,
+                        help="spawn interval multiplier per level")
+    parser.add_argument("--min-spawn-rate", type=float, default=ASTEROID_MIN_SPAWN_RATE,
+                        help="shortest spawn interval")
+    parser.add_argument("--speed-growth", type=float, default=ASTEROID_SPEED_GROWTH,
+                        help="asteroid speed multiplier per level")
+    parser.add_argument("--output", metavar="FILE", help="also write every session's result to FILE as JSON lines")
+    args = parser.parse_args()
+
+    settings = {
+        "input": args.input,
+        "ticks": args.ticks,
+        "tick_rate": args.tick_rate,
+        "array_asteroids": args.array_asteroids,
+        "spawn_rate": args.spawn_rate,
+        "spawn_rate_decay": args.spawn_rate_decay,
+        "min_spawn_rate": args.min_spawn_rate,
+        "speed_growth": args.speed_growth,
+    }
+    tasks = [(args.seed + i, settings) for i in range(args.sessions)]
+    report = Report()
+    output = open(args.output, "w") if args.output else None
+    start = time.perf_counter()
+    pool = multiprocessing.Pool(args.workers)
+    chunksize = max(1, args.sessions // (args.workers * 8))
+    for done, result in enumerate(pool.imap_unordered(run_session, tasks, chunksize), 1):
+        report.add(result)
+        if output is not None:
+            output.write(json.dumps(dict(zip(FIELDS, result))) + "\n")
+        if done % 100 == 0:
+            print(f"{done}/{args.sessions} sessions", file=sys.stderr)
+    # SDL catches SIGTERM in the workers, so they are left to exit on their
+    # own rather than terminated
+    pool.close()
+    pool.join()
+    if output is not None:
+        output.close()
+    report.print(time.perf_counter() - start, args.tick_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Draw time of a crowded frame, with asteroids blitted from cached rotation
+# frames against drawn as exact polygons, split into entity drawing and the
+# canvas finishing the frame (blending the explosions). The field is built
+# through the real game code and drawn off screen with the dummy video
+# driver, so this measures rasterizing only, not presenting.
+#
+#   python benchmarks/drawing.py                     1,000 asteroids plus shots and explosions
+#   python benchmarks/drawing.py --asteroids 3000
+#   python benchmarks/drawing.py --array-asteroids
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, ASTEROID_MIN_RADIUS, ASTEROID_KINDS
+from controls import ScriptedInput, autopilot
+from main import Game
+from shot import Shot, TrackingShot
+from canvas import Canvas
+
+SEED = 1
+
+
+def populate(game, asteroids, shots, explosions):
+    # A frozen field: asteroids, shots with a few tracking ones, and
+    # explosions part way through fading
+    game.start_game()
+    game.world.bind()
+    rng = game.rng.sim
+    field = game.asteroid_field
+    field.max_asteroids = asteroids
+    for i in range(asteroids):
+        position = pygame.Vector2(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+        field.spawn(ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS), position, pygame.Vector2(0, 0))
+    for i in range(shots):
+        shot_class = TrackingShot if i % 10 == 0 else Shot
+        shot = shot_class.create(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), rng.uniform(0, 360))
+        game.world.add(shot)
+    particles = game.world.particles
+    for i in range(explosions):
+        particles.emit(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                       ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS), game.rng,
+                       age=rng.uniform(0, particles.lifetime * 0.9))
+
+
+def measure(sprites, args):
+    game = Game(array_asteroids=args.array_asteroids, seed=SEED, effects=True, asteroid_sprites=sprites,
+                input_source=ScriptedInput(autopilot))
+    if game.asteroid_sprites is not None:
+        # Room for every asteroid's frame, so the cache doesn't churn and
+        # this measures drawing rather than rasterizing
+        game.asteroid_sprites.max_frames = max(game.asteroid_sprites.max_frames, args.asteroids * 2)
+    populate(game, args.asteroids, args.shots, args.explosions)
+    canvas = Canvas(game.screen)
+    entities = sum(game.world.counts().values())
+    times = []
+    for frame in range(args.frames):
+        game.screen.fill("black")
+        start = time.perf_counter()
+        game.world.draw(canvas, 0.5)
+        drawn = time.perf_counter()
+        canvas.finish()
+        times.append((drawn - start, time.perf_counter() - drawn))
+    game.world.clear()
+    # The first frames fill the asteroid sprite cache
+    times = sorted(times[len(times) // 10:], key=sum)
+    draw, finish = times[len(times) // 2]
+    return entities, draw * 1000, finish * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the draw time of a crowded frame")
+    parser.add_argument("--asteroids", type=int, default=1000)
+    parser.add_argument("--shots", type=int, default=500)
+    parser.add_argument("--explosions", type=int, default=100)
+    parser.add_argument("--frames", type=int, default=100, help="frames drawn per measurement")
+    parser.add_argument("--array-asteroids", action="store_true", help="use the NumPy asteroid engine")
+    args = parser.parse_args()
+
+    print(f"{'asteroids drawn as':<20}{'entities':>10}{'draw ms':>10}{'finish ms':>11}{'total ms':>10}")
+    for sprites in (True, False):
+        entities, draw, finish = measure(sprites, args)
+        label = "cached sprites" if sprites else "polygons"
+        print(f"{label:<20}{entities:>10}{draw:>10.2f}{finish:>11.2f}{draw + finish:>10.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
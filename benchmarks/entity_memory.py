@@ -0,0 +1,128 @@
+# Bytes per entity for shots, forcefield orbs, asteroids and explosions,
+# comparing the slotted entities, asteroids sharing library outlines and the
+# explosion particle ring against the layouts they replaced.
+#
+#   python benchmarks/entity_memory.py [count]
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import math
+import pygame
+from asteroid import Asteroid
+from constants import SHOT_RADIUS
+from rng import GameRandom
+from particles import Particles
+from shot import Shot, TrackingShot, ForcefieldShot
+
+
+# Shots as they were before slotting: a Sprite with its own image Surface and
+# rect next to the fields of every kind of shot
+class LegacyShot(pygame.sprite.Sprite):
+    def __init__(self, x, y, angle, is_forcefield=False, is_tracking=False):
+        super().__init__()
+        self.image = pygame.Surface((8, 4), pygame.SRCALPHA)
+        self.rect = self.image.get_rect(center=(x, y))
+        self.position = pygame.math.Vector2(x, y)
+        self.velocity = pygame.math.Vector2(0, -1).rotate(-angle) * 500
+        self.is_forcefield = is_forcefield
+        self.is_tracking = is_tracking
+        self.active = True
+        self.forcefield_angle = angle
+        self.forcefield_radius = 50
+        self.radius = SHOT_RADIUS
+        self.turn_speed = 180
+        self.angle = angle
+
+
+class LegacyExplosion(pygame.sprite.Sprite):
+    def __init__(self, position, radius, rng):
+        super().__init__()
+        self.position = pygame.Vector2(position)
+        self.previous_position = pygame.Vector2(position)
+        self.velocity = pygame.Vector2(0, 0)
+        self.radius = radius
+        self.rng = rng
+        self.lifetime = 0.3
+        self.time_alive = 0
+        fx = rng.fx
+        self.lines = [pygame.Vector2(fx.uniform(-radius, radius), fx.uniform(-radius, radius))
+                      for _ in range(fx.randint(8, 12))]
+
+
+# An asteroid with its own outline, as every asteroid had before the shape
+# library
+class LegacyAsteroid(pygame.sprite.Sprite):
+    def __init__(self, x, y, radius, rng):
+        super().__init__()
+        self.position = pygame.Vector2(x, y)
+        self.previous_position = pygame.Vector2(x, y)
+        self.velocity = pygame.Vector2(0, 0)
+        self.radius = radius
+        self.rng = rng
+        fx = rng.fx
+        count = fx.randint(8, 12)
+        self.vertices = []
+        for i in range(count):
+            angle = (i / count) * 2 * math.pi
+            length = radius * fx.uniform(0.7, 1.3)
+            self.vertices.append(pygame.Vector2(math.cos(angle) * length, math.sin(angle) * length))
+        self.shape_id = i
+        self.frame_cache = None
+        self.rotation = fx.uniform(0, 360)
+        self.rotation_speed = fx.uniform(-30, 30)
+
+
+def measure(make, count):
+    # Average bytes allocated per live object, including its vectors, lists,
+    # group bookkeeping and surface pixels
+    group = pygame.sprite.Group()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make(i) for i in range(count)]
+    for obj in objects:
+        obj.add(group)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # SDL allocates surface pixels where tracemalloc can't see them
+    pixels = sum(obj.image.get_pitch() * obj.image.get_height() for obj in objects if hasattr(obj, "image"))
+    # The list holding them isn't part of any entity
+    return (after - before - sys.getsizeof(objects) + pixels) / count
+
+
+def measure_particles(count, rng):
+    # Average bytes per explosion in a ring just big enough for them all
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    particles = Particles(capacity=count * 12)
+    for i in range(count):
+        particles.emit(i, i, 30, rng)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = GameRandom(0)
+    cases = [
+        ("shot", lambda i: LegacyShot(i, i, i), lambda i: Shot(i, i, i)),
+        ("tracking shot", lambda i: LegacyShot(i, i, i, is_tracking=True), lambda i: TrackingShot(i, i, i)),
+        ("forcefield orb", lambda i: LegacyShot(i, i, i, is_forcefield=True), lambda i: ForcefieldShot(i, i, i)),
+        ("asteroid", lambda i: LegacyAsteroid(i, i, 40, rng), lambda i: Asteroid(i, i, 40, rng)),
+    ]
+    print(f"{'entity':<16}{'sprite':>10}{'now':>10}{'saved':>8}")
+    for name, legacy, current in cases:
+        before = measure(legacy, count)
+        after = measure(current, count)
+        print(f"{name:<16}{before:>10.0f}{after:>10.0f}{1 - after / before:>8.0%}")
+    before = measure(lambda i: LegacyExplosion((i, i), 30, rng), count)
+    after = measure_particles(count, rng)
+    print(f"{'explosion':<16}{before:>10.0f}{after:>10.0f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
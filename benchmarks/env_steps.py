@@ -0,0 +1,61 @@
+# Throughput of the learning environment in env-steps/sec under a random
+# policy, for a few numbers of games stepped in lockstep, and the share of
+# that time spent building observations.
+#
+#   python benchmarks/env_steps.py
+#   python benchmarks/env_steps.py --envs 1 32 256 --frame-skip 4
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from env import AsteroidsEnv
+
+SEED = 1
+
+
+def measure(num_envs, args):
+    env = AsteroidsEnv(num_envs, seed=SEED, frame_skip=args.frame_skip)
+    env.reset()
+    rng = np.random.default_rng(SEED)
+    observe = env.observe
+    observe_time = 0.0
+
+    def timed_observe():
+        nonlocal observe_time
+        start = time.perf_counter()
+        observations = observe()
+        observe_time += time.perf_counter() - start
+        return observations
+
+    env.observe = timed_observe
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = rng.integers(0, 32, num_envs)
+        _, _, dones, _ = env.step(actions)
+        episodes += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    for game in env.games:
+        game.world.clear()
+    return num_envs * args.steps / elapsed, observe_time / elapsed, episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure learning environment throughput")
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 8, 64], help="games stepped together")
+    parser.add_argument("--steps", type=int, default=1000, help="env steps per measurement")
+    parser.add_argument("--frame-skip", type=int, default=1, help="simulation steps per env step")
+    args = parser.parse_args()
+
+    print(f"{'envs':>6}{'env-steps/sec':>15}{'observing':>11}{'episodes':>10}")
+    for num_envs in args.envs:
+        rate, observing, episodes = measure(num_envs, args)
+        print(f"{num_envs:>6}{rate:>15.0f}{observing:>10.0%}{episodes:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Stress scenarios run headless through the real game code. Each one reports
+# ticks/sec, median and 99th percentile step time and peak traced memory,
+# and is checked against benchmarks/baseline.json.
+#
+#   python benchmarks/scenarios.py                  run everything, compare to baseline
+#   python benchmarks/scenarios.py rapid_fire       run some scenarios
+#   python benchmarks/scenarios.py --save-baseline  record the current numbers
+#
+# Every scenario is timed next to a fixed reference workload that doesn't
+# touch the game code, and its speed is checked relative to that reference,
+# so a slower or busier machine than the one that recorded the baseline
+# doesn't show up as a regression. Memory is checked as is. A regression
+# makes the script exit with status 1, for CI.
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, ASTEROID_MIN_RADIUS, ASTEROID_KINDS
+from controls import InputState, ScriptedInput, autopilot
+from main import Game
+from shot import TrackingShot
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SEED = 1
+TOLERANCE = 0.5  # used when neither the command line nor the baseline sets one
+REFERENCE_STEPS = 100000
+
+
+def hold_fire(tick):
+    # Keep shooting while turning, so shots go out in every direction
+    return InputState(left=True, shoot=True)
+
+
+def spawn_ring(game, count, distance, speed):
+    # Asteroids evenly spaced around the player, all heading for it
+    rng = game.rng.sim
+    center = game.player.position
+    for i in range(count):
+        direction = pygame.Vector2(1, 0).rotate(360 * i / count)
+        radius = ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS)
+        game.asteroid_field.spawn(radius, center + direction * distance, -direction * speed)
+
+
+def level_ten(game):
+    # Level 10 spawn rate and speed
+    game.level = game.world.level = 10
+
+
+def rapid_fire(game):
+    # 16x fire rate with dual and side shots, four shots per volley
+    game.player.fire_rate_multiplier = 16
+    game.player.dual_shot = True
+    game.player.side_shot = True
+
+
+def tracking_shots(game):
+    # 50 tracking shots in flight against a full field
+    game.asteroid_field.max_asteroids = 300
+    spawn_ring(game, 200, 350, 20)
+
+    def tick(game):
+        missing = 50 - sum(1 for shot in game.shots if shot.is_tracking)
+        for i in range(missing):
+            angle = game.rng.sim.uniform(0, 360)
+            game.world.add(TrackingShot.create(game.player.position.x, game.player.position.y, angle))
+    return tick
+
+
+def forcefield(game):
+    # A forcefield that never runs out, with asteroids rammed into it
+    game.player.forcefield = True
+    game.player.max_forcefield_hits = math.inf
+
+    def tick(game):
+        if len(game.asteroids) < 40:
+            spawn_ring(game, 8, 120, 150)
+    return tick
+
+
+def crowd(game):
+    # 5,000 live asteroids wrapping around the screen
+    field = game.asteroid_field
+    field.max_asteroids = 5000
+    field.wrap = True
+    rng = game.rng.sim
+    for i in range(5000):
+        position = pygame.Vector2(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+        velocity = pygame.Vector2(rng.uniform(20, 80), 0).rotate(rng.uniform(0, 360))
+        field.spawn(ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS), position, velocity)
+
+
+# name -> (input script, setup, steps run). setup may return a hook run
+# before every step.
+SCENARIOS = {
+    "level_ten": (autopilot, level_ten, 1200),
+    "rapid_fire": (hold_fire, rapid_fire, 600),
+    "tracking_shots": (hold_fire, tracking_shots, 300),
+    "forcefield": (autopilot, forcefield, 600),
+    "crowd": (hold_fire, crowd, 120),
+}
+
+
+def simulate(name, ticks, array_asteroids, trace=False):
+    # Returns the time taken by every step. Dying and levelling up are undone
+    # after each step so a scenario keeps its load for the whole run.
+    script, setup, _ = SCENARIOS[name]
+    game = Game(array_asteroids=array_asteroids, headless=True, seed=SEED, input_source=ScriptedInput(script))
+    game.start_game()
+    game.world.bind()
+    game.asteroids_for_next_level = math.inf
+    hook = setup(game)
+    times = []
+    if trace:
+        tracemalloc.start()
+    for _ in range(ticks):
+        start = time.perf_counter()
+        if hook is not None:
+            game.world.bind()
+            hook(game)
+        game.step(game.step_dt)
+        times.append(time.perf_counter() - start)
+        game.game_over = False
+        game.level_up = False
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    if trace:
+        tracemalloc.stop()
+    game.world.clear()
+    return times, peak
+
+
+def reference():
+    # Steps/sec of a fixed mix of vector maths and Python loops, standing in
+    # for how fast this machine runs the game at the moment
+    position, velocity = pygame.Vector2(), pygame.Vector2(3, 4)
+    hits = 0
+    start = time.perf_counter()
+    for _ in range(REFERENCE_STEPS):
+        position += velocity * 0.01
+        if position.distance_squared_to(velocity) < 100:
+            hits += 1
+    return REFERENCE_STEPS / (time.perf_counter() - start)
+
+
+def measure(name, ticks, array_asteroids, repeat=1):
+    # The fastest of `repeat` runs, as other processes only ever slow a run
+    # down. The reference is run between them, so both see the same load.
+    runs, references = [], []
+    for _ in range(repeat):
+        references.append(reference())
+        runs.append(simulate(name, ticks, array_asteroids)[0])
+    times = min(runs, key=sum)
+    # Memory is traced on a second, identical run so tracing doesn't skew the timings
+    _, peak = simulate(name, ticks, array_asteroids, trace=True)
+    times.sort()
+    return {
+        "ticks_per_sec": len(times) / sum(times),
+        "p50_ms": times[len(times) // 2] * 1000,
+        "p99_ms": times[min(len(times) - 1, int(len(times) * 0.99))] * 1000,
+        "peak_kb": peak / 1024,
+        "reference_per_sec": max(references),
+    }
+
+
+def machine():
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def regressions(result, baseline, tolerance):
+    problems = []
+    # The baseline's speed, scaled by how much faster the reference ran here
+    scale = result["reference_per_sec"] / baseline.get("reference_per_sec", result["reference_per_sec"])
+    expected = baseline["ticks_per_sec"] * scale
+    if result["ticks_per_sec"] < expected * (1 - tolerance):
+        problems.append(f"ticks/sec {result['ticks_per_sec']:.0f} < {expected:.0f} expected from the baseline")
+    if result["peak_kb"] > baseline["peak_kb"] * (1 + tolerance):
+        problems.append(f"peak memory {result['peak_kb']:.0f}KB > baseline {baseline['peak_kb']:.0f}KB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run benchmark scenarios")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--ticks", type=int, help="simulation steps per scenario, overriding its own")
+    parser.add_argument("--array-asteroids", action="store_true", help="use the NumPy asteroid engine")
+    parser.add_argument("--tolerance", type=float,
+                        help=f"fraction a scenario may fall behind its baseline before failing "
+                             f"(default: the baseline's, or {TOLERANCE})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the fastest is kept")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    recorded = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            recorded = json.load(f)
+    baselines = recorded.get("scenarios", {})
+    tolerance = args.tolerance if args.tolerance is not None else recorded.get("tolerance", TOLERANCE)
+    if not args.save_baseline and recorded and recorded.get("machine") != machine():
+        print(f"note: the baseline was recorded on another machine ({recorded['machine']['platform']}, "
+              f"{recorded['machine']['cpus']} cpus), speeds are compared relative to the reference")
+
+    failed = False
+    print(f"{'scenario':<24}{'ticks/sec':>10}{'p50 ms':>9}{'p99 ms':>9}{'peak KB':>10}{'reference/sec':>15}")
+    for name in args.scenarios or SCENARIOS:
+        key = name + ("[array]" if args.array_asteroids else "")
+        result = measure(name, args.ticks or SCENARIOS[name][2], args.array_asteroids, args.repeat)
+        print(f"{key:<24}{result['ticks_per_sec']:>10.0f}{result['p50_ms']:>9.2f}"
+              f"{result['p99_ms']:>9.2f}{result['peak_kb']:>10.0f}{result['reference_per_sec']:>15.0f}")
+        if args.save_baseline:
+            baselines[key] = result
+        elif key in baselines:
+            for problem in regressions(result, baselines[key], tolerance):
+                print(f"  REGRESSION: {problem}")
+                failed = True
+
+    if args.save_baseline:
+        recorded = {
+            "note": "Speeds are compared relative to reference_per_sec. Re-record with --save-baseline after "
+                    "changing the hot paths.",
+            "machine": machine(),
+            "tolerance": tolerance,
+            "repeat": args.repeat,
+            "scenarios": baselines,
+        }
+        with open(BASELINE, "w") as f:
+            json.dump(recorded, f, indent=2, sort_keys=True)
+            f.write("\n")
+    pygame.quit()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import pygame
+
+
+# Where entities draw. Entity.draw(canvas, alpha) describes its outline with
+# the primitives below instead of calling pygame.draw itself, and the canvas
+# decides how that reaches the screen. finish() puts the frame's drawing on
+# the screen and returns every rect touched, for dirty rect rendering.
+#
+# Canvas draws each primitive straight away, one pygame call per shape.
+# Faded lines go onto a shared transparent layer instead, which finish()
+# blends over the screen, so a fading explosion lets what is behind it show
+# through.
+class Canvas:
+    def __init__(self, screen):
+        self.screen = screen
+        self.rects = []
+        self.layer = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        self.faded = []  # rects drawn on the layer this frame
+
+    def blit(self, surface, x, y):
+        self.rects.append(self.screen.blit(surface, (x, y)))
+
+    def outline(self, points, closed=True, width=2):
+        # White polyline through points, closed for polygons
+        self.rects.append(pygame.draw.lines(self.screen, "white", closed, points, width))
+
+    def circle(self, position, radius, width=2):
+        self.rects.append(pygame.draw.circle(self.screen, "white", position, radius, width))
+
+    def fade_lines(self, points, fade):
+        # White polyline at `fade` opacity (0-255)
+        self.faded.append(pygame.draw.lines(self.layer, (255, 255, 255, fade), False, points, 2))
+
+    def finish(self):
+        rects = self.rects
+        if self.faded:
+            rects += self._blend_faded()
+        self.rects = []
+        return rects
+
+    def _blend_faded(self):
+        # Only the parts of the layer the lines cover are blended and cleared.
+        # Overlapping rects are merged first so no pixel is blended twice.
+        layer = self.layer
+        areas = []
+        for rect in self.faded:
+            index = rect.collidelist(areas)
+            while index != -1:
+                rect = rect.union(areas.pop(index))
+                index = rect.collidelist(areas)
+            areas.append(rect)
+        self.faded = []
+        rects = self.screen.blits([(layer, area, area) for area in areas])
+        for area in areas:
+            layer.fill((0, 0, 0, 0), area)
+        return rects
@@ -1,19 +1,63 @@
+import math
 import pygame
 
+# Objects that move further than this in one simulation step (screen wrap,
+# forcefield bounce) are drawn at their new position instead of interpolated
+INTERPOLATION_SNAP_DISTANCE = 100
+
+
+def interpolate(previous, current, alpha):
+    # Position between the last two simulation steps for rendering
+    if alpha >= 1.0 or previous.distance_squared_to(current) > INTERPOLATION_SNAP_DISTANCE ** 2:
+        return current
+    return previous.lerp(current, alpha)
+
+
+def swept_start(shape):
+    # Where a shape's movement over the last step started. Jumps (screen
+    # wrap, forcefield bounce) count as starting at the new position.
+    previous, position = shape.previous_position, shape.position
+    if previous.distance_squared_to(position) > INTERPOLATION_SNAP_DISTANCE ** 2:
+        return position
+    return previous
+
+
+def time_of_impact(a, b):
+    # Fraction of the last step (0 to 1) at which two circles moving in
+    # straight lines from previous_position to position first touched, or
+    # None if they never did. Unlike a check of the end positions this
+    # catches fast objects that passed through each other within a step.
+    a_start, b_start = swept_start(a), swept_start(b)
+    sx = a_start.x - b_start.x
+    sy = a_start.y - b_start.y
+    reach = a.radius + b.radius
+    c = sx * sx + sy * sy - reach * reach
+    if c <= 0:
+        return 0.0  # already touching at the start of the step
+    # Relative movement over the step
+    dx = (a.position.x - b.position.x) - sx
+    dy = (a.position.y - b.position.y) - sy
+    half_b = sx * dx + sy * dy
+    if half_b >= 0:
+        return None  # not closing in
+    a2 = dx * dx + dy * dy
+    discriminant = half_b * half_b - a2 * c
+    if discriminant < 0:
+        return None  # closest approach is still apart
+    t = (-half_b - math.sqrt(discriminant)) / a2
+    return t if t <= 1.0 else None
+
 # Base class for game objects
 class CircleShape(pygame.sprite.Sprite):
     def __init__(self, x, y, radius):
-        # we will be using this later
-        if hasattr(self, "containers"):
-            super().__init__(self.containers)
-        else:
-            super().__init__()
+        super().__init__()
 
         self.position = pygame.Vector2(x, y)
+        self.previous_position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
         self.radius = radius
 
-    def draw(self, screen):
+    def draw(self, canvas, alpha=1.0):
         # sub-classes must override
         pass
 
@@ -22,4 +66,4 @@ class CircleShape(pygame.sprite.Sprite):
         pass
 
     def collision(self, other):
-        return self.position.distance_to(other.position) <= self.radius + other.radius
\ No newline at end of file
+        return self.position.distance_to(other.position) <= self.radius + other.radius
@@ -4,11 +4,45 @@ SCREEN_HEIGHT = 720
 ASTEROID_MIN_RADIUS = 20
 ASTEROID_KINDS = 3
 ASTEROID_SPAWN_RATE = 0.8  # seconds
+ASTEROID_SPAWN_RATE_DECAY = 0.9  # spawn interval multiplier per level
+ASTEROID_MIN_SPAWN_RATE = 0.2  # seconds
+ASTEROID_SPEED_GROWTH = 1.1  # asteroid speed multiplier per level
 ASTEROID_MAX_RADIUS = ASTEROID_MIN_RADIUS * ASTEROID_KINDS
+ASTEROID_MAX_COUNT = 150  # hard cap on live asteroids per field
+ASTEROID_WRAP = False  # wrap asteroids around the screen instead of retiring them
+ASTEROID_SHAPE_VARIANTS = 8  # outlines made for each asteroid size, shared by all asteroids of that size
+ASTEROID_SHAPE_SEED = 0  # seed the shared outlines are made from
 
 PLAYER_RADIUS = 20
 PLAYER_TURN_SPEED = 300
 PLAYER_SPEED = 200
 SHOT_RADIUS = 5
 PLAYER_SHOOT_SPEED = 500
-PLAYER_SHOOT_COOLDOWN = 0.3
\ No newline at end of file
+PLAYER_SHOOT_COOLDOWN = 0.3
+TRACKING_SHOT_RANGE = 600  # tracking shots lock onto asteroids within this distance
+
+SIMULATION_TICK_RATE = 120  # fixed simulation steps per second
+MAX_CATCH_UP_STEPS = 5  # most simulation steps run per rendered frame
+
+REWIND_SECONDS = 10  # seconds of play kept for rewinding, a snapshot every step
+REWIND_STEP = 1  # seconds each BACKSPACE goes back
+CHECKPOINT_INTERVAL = SIMULATION_TICK_RATE * 60  # steps between checkpoints of a headless run
+
+PARTICLE_CAPACITY = 4096  # explosion lines alive at once, the oldest are overwritten past this
+EXPLOSION_LIFETIME = 0.3  # seconds an explosion takes to fade out
+
+ASTEROID_SPRITE_CACHE = True  # blit pre-rendered asteroid frames instead of drawing polygons
+ASTEROID_ROTATION_STEP = 3  # degrees between cached asteroid rotations
+ASTEROID_SPRITE_CACHE_FRAMES = 512  # most asteroid frames kept at once
+
+TEXT_CACHE_SIZE = 128  # rendered text surfaces kept for reuse
+
+UPGRADE_OFFERS = 2  # upgrades to choose from at each level up
+
+PROFILER_WINDOW = 120  # frames averaged by the profiling overlay
+PROFILER_OVERLAY_REFRESH = 15  # frames between overlay refreshes
+
+DIRTY_RECTS = True  # present only the changed parts of the window
+DIRTY_RECT_THRESHOLD = 0.4  # fraction of the screen past which a full flip is used instead
+
+ENV_NEAREST_ASTEROIDS = 8  # asteroids described in each learning environment observation
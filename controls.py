@@ -0,0 +1,87 @@
+import pygame
+from constants import SCREEN_WIDTH
+
+
+# Everything the player can do in one simulation step. Game polls an input
+# source once per step and hands the result to the player, so the simulation
+# never reads the keyboard directly.
+class InputState:
+    def __init__(self, thrust=False, reverse=False, left=False, right=False, shoot=False, upgrade=None):
+        self.thrust = thrust
+        self.reverse = reverse
+        self.left = left
+        self.right = right
+        self.shoot = shoot
+        self.upgrade = upgrade  # key of the level up option picked this step, e.g. "1"
+
+
+class KeyboardInput:
+    def __init__(self):
+        self.pending_upgrade = None
+
+    def handle_event(self, event):
+        # Upgrade choices are key presses rather than held keys, so they are
+        # remembered until the next poll
+        if event.type == pygame.KEYDOWN and event.unicode:
+            self.pending_upgrade = event.unicode
+
+    def poll(self):
+        keys = pygame.key.get_pressed()
+        state = InputState(
+            thrust=keys[pygame.K_w],
+            reverse=keys[pygame.K_s],
+            left=keys[pygame.K_a],
+            right=keys[pygame.K_d],
+            shoot=keys[pygame.K_SPACE],
+            upgrade=self.pending_upgrade,
+        )
+        self.pending_upgrade = None
+        return state
+
+
+class ScriptedInput:
+    # Feeds input from a function of the step number, for running without a
+    # keyboard
+    def __init__(self, script):
+        self.script = script
+        self.tick = 0
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        state = self.script(self.tick)
+        self.tick += 1
+        return state
+
+
+def autopilot(tick):
+    # Default headless script: spin slowly, keep firing and always take the
+    # first upgrade offered
+    return InputState(left=(tick // 240) % 2 == 0, right=(tick // 240) % 2 == 1, shoot=True, upgrade="1")
+
+
+class AimBot:
+    # Plays by itself: turns towards the nearest asteroid, keeps firing and
+    # always takes the first upgrade offered. It reads the game it plays, set
+    # on `game` once the game is created.
+    def __init__(self, game=None):
+        self.game = game
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        game = self.game
+        player = game.player
+        target = game.targets.nearest(player.position, SCREEN_WIDTH)
+        left = right = False
+        if target is not None:
+            forward = pygame.Vector2(0, -1).rotate(-player.angle)
+            turn = forward.angle_to(target.position - player.position)
+            turn = (turn + 180) % 360 - 180
+            # Turning left raises the player's angle, which turns forward
+            # the negative way
+            left = turn < -5
+            right = turn > 5
+        return InputState(left=left, right=right, shoot=True, upgrade="1")
@@ -0,0 +1,53 @@
+# Slotted stand-in for pygame.sprite.Sprite, for objects there are a lot of
+# at once (shots, forcefield orbs). pygame.sprite.Sprite gives
+# every instance a __dict__; these only carry the fields they declare.
+# Entities work with pygame sprite groups through the same add_internal /
+# remove_internal protocol a Sprite uses.
+class Entity:
+    __slots__ = ("_groups",)
+
+    def __init__(self, *groups):
+        self._groups = set()
+        if groups:
+            self.add(*groups)
+
+    def add(self, *groups):
+        for group in groups:
+            if hasattr(group, "_spritegroup"):
+                if group not in self._groups:
+                    group.add_internal(self)
+                    self._groups.add(group)
+            else:
+                self.add(*group)
+
+    def remove(self, *groups):
+        for group in groups:
+            if hasattr(group, "_spritegroup"):
+                if group in self._groups:
+                    group.remove_internal(self)
+                    self._groups.remove(group)
+            else:
+                self.remove(*group)
+
+    def add_internal(self, group):
+        self._groups.add(group)
+
+    def remove_internal(self, group):
+        self._groups.remove(group)
+
+    def kill(self):
+        for group in self._groups:
+            group.remove_internal(self)
+        self._groups.clear()
+
+    def alive(self):
+        return bool(self._groups)
+
+    def groups(self):
+        return list(self._groups)
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def draw(self, canvas, alpha=1.0):
+        pass
@@ -0,0 +1,158 @@
+# Reinforcement learning environment: N independent headless games stepped
+# in lockstep in one process, Gym style.
+#
+#   env = AsteroidsEnv(64, seed=1)
+#   observations = env.reset()
+#   observations, rewards, dones, infos = env.step(actions)
+#
+# Actions are replay input codes (replay.encode), one per game: the control
+# bits plus an optional upgrade key. Games at a level up take the first
+# option unless the action picks another. The reward is the score gained
+# over the step, less death_penalty when the game ends. A finished game
+# starts over straight away; its info holds the final score and observation.
+#
+# Observations are float32 rows of observation_size() values. The player comes
+# first, then the nearest asteroids, closest first, zero filled when there
+# are fewer. Positions are scaled by the screen size and velocities by the
+# player's top speed. Every game runs the array asteroid engine, so the
+# asteroid part is built from all the stores at once with no per-asteroid
+# Python.
+import random
+from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_SPEED, ASTEROID_MAX_RADIUS,
+                       SIMULATION_TICK_RATE, ENV_NEAREST_ASTEROIDS)
+from controls import InputState
+from replay import decode
+
+try:
+    import numpy as np
+except ImportError:  # the environment is optional
+    np = None
+
+# Per-player values: position, heading as a unit vector, velocity, live shots
+PLAYER_FEATURES = ("x", "y", "heading_x", "heading_y", "velocity_x", "velocity_y", "shots")
+# Per-asteroid values, relative to the player; present is 1 for a real asteroid
+ASTEROID_FEATURES = ("dx", "dy", "velocity_x", "velocity_y", "radius", "present")
+PLAYER_MAX_SPEED = PLAYER_SPEED * 2
+
+
+def observation_size(nearest=ENV_NEAREST_ASTEROIDS):
+    return len(PLAYER_FEATURES) + nearest * len(ASTEROID_FEATURES)
+
+
+class ActionInput:
+    # Input source the environment sets each step
+    def __init__(self):
+        self.state = InputState()
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        return self.state
+
+
+class AsteroidsEnv:
+    def __init__(self, num_envs, seed=None, nearest=ENV_NEAREST_ASTEROIDS, tick_rate=SIMULATION_TICK_RATE,
+                 frame_skip=1, max_ticks=SIMULATION_TICK_RATE * 300, death_penalty=0.0):
+        if np is None:
+            raise RuntimeError("the environment requires numpy")
+        from main import Game
+        self.num_envs = num_envs
+        self.nearest = nearest
+        self.frame_skip = frame_skip  # simulation steps per env step, repeating the action
+        self.max_ticks = max_ticks  # games are cut short after this many simulation steps
+        self.death_penalty = death_penalty
+        seeds = random.Random(seed)
+        self.games = [Game(array_asteroids=True, headless=True, tick_rate=tick_rate,
+                           seed=seeds.getrandbits(32), input_source=ActionInput())
+                      for _ in range(num_envs)]
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.observation_size = observation_size(nearest)
+
+    def reset(self):
+        for game in self.games:
+            game.new_game()
+        self.ticks[:] = 0
+        return self.observe()
+
+    def step(self, actions):
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = [{} for _ in range(self.num_envs)]
+        finished = []
+        for i, game in enumerate(self.games):
+            controls = decode(int(actions[i]))
+            if controls.upgrade is None:
+                controls.upgrade = "1"
+            game.input.state = controls
+            score = game.score
+            ticks = 0
+            while ticks < self.frame_skip and not game.game_over:
+                game.step(game.step_dt)
+                ticks += 1
+            self.ticks[i] += ticks
+            rewards[i] = game.score - score
+            if game.game_over:
+                rewards[i] -= self.death_penalty
+                finished.append(i)
+            elif self.ticks[i] >= self.max_ticks:
+                finished.append(i)
+        if finished:
+            final = self.observe()[finished]
+            for i, observation in zip(finished, final):
+                game = self.games[i]
+                dones[i] = True
+                infos[i] = {"score": game.score, "level": game.level, "ticks": int(self.ticks[i]),
+                            "truncated": not game.game_over, "final_observation": observation}
+                game.new_game()
+                self.ticks[i] = 0
+        return self.observe(), rewards, dones, infos
+
+    def observe(self):
+        # A fresh (num_envs, observation_size) array for the current state
+        n = self.num_envs
+        players = np.empty((n, 6))  # x, y, angle, velocity x, velocity y, shots
+        stores = []
+        for i, game in enumerate(self.games):
+            player = game.player
+            players[i] = (player.position.x, player.position.y, player.angle,
+                          player.velocity.x, player.velocity.y, len(game.shots))
+            stores.append(game.asteroid_store)
+
+        observations = np.zeros((n, self.observation_size), dtype=np.float32)
+        position = players[:, :2]
+        # Player.angle turns the ship anticlockwise from facing up the screen
+        heading = np.radians(players[:, 2])
+        observations[:, 0] = position[:, 0] / SCREEN_WIDTH
+        observations[:, 1] = position[:, 1] / SCREEN_HEIGHT
+        observations[:, 2] = -np.sin(heading)
+        observations[:, 3] = -np.cos(heading)
+        observations[:, 4:6] = players[:, 3:5] / PLAYER_MAX_SPEED
+        observations[:, 6] = players[:, 5]
+
+        counts = np.array([store.count for store in stores], dtype=np.intp)
+        total = counts.sum()
+        if total and self.nearest:
+            owner = np.repeat(np.arange(n), counts)
+            asteroid_position = np.concatenate([store.position[:store.count] for store in stores])
+            velocity = np.concatenate([store.velocity[:store.count] for store in stores])
+            radius = np.concatenate([store.radius[:store.count] for store in stores])
+            delta = asteroid_position - position[owner]
+            distance = np.einsum("ij,ij->i", delta, delta)
+            # Sorted by game, then by distance within each game; an
+            # asteroid's rank is its place in its game's run
+            order = np.lexsort((distance, owner))
+            starts = np.cumsum(counts) - counts
+            rank = np.arange(total) - starts[owner[order]]
+            keep = rank < self.nearest
+            rows, rank = order[keep], rank[keep]
+            asteroids = observations[:, len(PLAYER_FEATURES):]
+            asteroids = asteroids.reshape(n, self.nearest, len(ASTEROID_FEATURES))
+            slots = (owner[rows], rank)
+            asteroids[slots + (0,)] = delta[rows, 0] / SCREEN_WIDTH
+            asteroids[slots + (1,)] = delta[rows, 1] / SCREEN_HEIGHT
+            asteroids[slots + (2,)] = velocity[rows, 0] / PLAYER_MAX_SPEED
+            asteroids[slots + (3,)] = velocity[rows, 1] / PLAYER_MAX_SPEED
+            asteroids[slots + (4,)] = radius[rows] / ASTEROID_MAX_RADIUS
+            asteroids[slots + (5,)] = 1
+        return observations
@@ -1,16 +1,76 @@
+import argparse
+import os
+import random
+import time
 import pygame
 import sys
 from constants import *
 from player import Player
-from asteroid import Asteroid
 from asteroidfield import AsteroidField
-from shot import Shot
+from spatialhash import SpatialHash
+from asteroidstore import AsteroidStore, ArrayAsteroid, HAVE_NUMPY
+from controls import KeyboardInput, ScriptedInput, autopilot
+from rng import GameRandom
+from replay import Replay, InputRecorder, ReplayInput
+from textcache import TextCache
+from spritecache import AsteroidSpriteCache
+from world import World
+from profiler import Profiler
+from upgrades import UpgradeTree
+from renderer import DirtyRenderer
+from canvas import Canvas
+from snapshot import RewindBuffer, save as save_snapshot, load as load_snapshot
+
+# Every scope a frame is timed in, besides the per-system update_ and draw_
+# ones, for the profiler's CSV columns
+PROFILER_SCOPES = ("events", "wait", "input", "shoot", "collisions", "rewind", "canvas", "hud", "flip")
+
 
 class Game:
-    def __init__(self):
+    def __init__(self, array_asteroids=False, fixed_timestep=True, tick_rate=SIMULATION_TICK_RATE,
+                 max_steps=MAX_CATCH_UP_STEPS, max_fps=60, headless=False, input_source=None,
+                 seed=None, effects=None, asteroid_sprites=ASTEROID_SPRITE_CACHE, pooling=True, profiler=None,
+                 dirty_rects=DIRTY_RECTS, rewind_seconds=None):
+        self.headless = headless
+        # Per-frame timings, shown with F3 and/or exported; off by default
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.show_profiler = False
+        self.rng = GameRandom(seed)
+        # Cosmetic effects default to off when nothing is drawn
+        self.effects = not headless if effects is None else effects
+        # Pre-rendered asteroid frames, shared by every game the cache lives for
+        self.asteroid_sprites = AsteroidSpriteCache() if asteroid_sprites and not headless else None
+        # Everything live in the game, and the drifting asteroids behind the
+        # intro screen. Killed shots and asteroids are recycled through each
+        # world's pools.
+        self.world = World(pooling, self.asteroid_sprites, self.effects)
+        self.intro_world = World(pooling, self.asteroid_sprites, self.effects)
+        self.pools = self.world.pools
+        self.world.profiler = self.intro_world.profiler = self.profiler
+        systems = list(self.world.systems)
+        scopes = PROFILER_SCOPES + tuple(f"{phase}_{name}" for phase in ("update", "draw") for name in systems)
+        self.profiler.declare(scopes, systems + ["text_hits", "text_misses"])
+        if headless:
+            # No window at all; the dummy driver keeps pygame.init happy on
+            # machines without a display
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
         self.clock = pygame.time.Clock()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.input = input_source if input_source is not None else KeyboardInput()
+        self.fixed_timestep = fixed_timestep
+        self.step_dt = 1.0 / tick_rate
+        self.max_steps = max_steps  # most simulation steps run per rendered frame
+        self.max_fps = max_fps  # 0 renders as fast as possible
+        self.screen = None if headless else pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Only the changed parts of the window are presented each frame
+        self.renderer = None if headless else DirtyRenderer(self.screen, dirty_rects)
+        # Entities draw onto a canvas, which blends fading explosions
+        self.canvas = None if headless else Canvas(self.screen)
+        # A snapshot of every step of the last few seconds, for BACKSPACE to
+        # rewind through. Off when headless unless asked for.
+        if rewind_seconds is None:
+            rewind_seconds = 0 if headless else REWIND_SECONDS
+        self.rewind = RewindBuffer(round(rewind_seconds * tick_rate)) if rewind_seconds > 0 else None
         self.game_over = False
         self.game_over_text = "Game Over!"
         self.text_progress = 0
@@ -21,67 +81,62 @@ class Game:
         try:
             self.font = pygame.font.Font("assets/fonts/PressStart2P-Regular.ttf", 36)  # Main title font
             self.small_font = pygame.font.Font("assets/fonts/PressStart2P-Regular.ttf", 16)  # Controls and descriptions
+            self.tiny_font = pygame.font.Font("assets/fonts/PressStart2P-Regular.ttf", 8)  # Profiling overlay
             self.score_font = pygame.font.Font("assets/fonts/PressStart2P-Regular.ttf", 24)  # Score and level
         except:
             # Fallback to default font if Press Start 2P is not available
             print("Warning: Press Start 2P font not found, using default font")
             self.font = pygame.font.Font(None, 74)
             self.small_font = pygame.font.Font(None, 36)
+            self.tiny_font = pygame.font.Font(None, 18)
             self.score_font = pygame.font.Font(None, 48)
         
+        # Rendered text lives as long as the game, across restarts
+        self.text = TextCache()
+        self.text_hits = self.text_misses = 0  # cache counters at the end of the last frame
+        self.upgrade_tree = UpgradeTree.load()
         self.level_up = False
         self.upgrade_options = []
-        self.rapid_fire_taken = False
-        self.super_rapid_fire_taken = False
-        self.ultra_rapid_fire_taken = False
-        self.dual_shot_taken = False
-        self.side_shot_taken = False
-        self.tracking_shots_taken = False
-        self.mega_rapid_fire_taken = False
-        self.forcefield_taken = False
+        self.upgrades_taken = set()
         self.intro_screen = True
-        self.intro_updatable = pygame.sprite.Group()
-        self.intro_drawable = pygame.sprite.Group()
-        self.intro_asteroids = pygame.sprite.Group()
-        self.intro_asteroid_field = None
-        self.updatable = pygame.sprite.Group()
-        self.drawable = pygame.sprite.Group()
-        self.asteroids = pygame.sprite.Group()
-        self.shots = pygame.sprite.Group()
+        self.asteroid_grid = SpatialHash()
+        self.shot_grid = SpatialHash()
+        self.array_asteroids = array_asteroids
+        if array_asteroids and not HAVE_NUMPY:
+            print("Warning: numpy not found, using sprite asteroids")
+            self.array_asteroids = False
+        self.asteroid_store = None
+        self.targets = self.asteroid_grid  # nearest asteroid queries for tracking shots
         self.reset_game()
 
     def reset_game(self):
         # Clear existing sprites
-        for sprite in self.updatable:
-            sprite.kill()
-        for sprite in self.drawable:
-            sprite.kill()
-        for sprite in self.intro_updatable:
-            sprite.kill()
-        for sprite in self.intro_drawable:
-            sprite.kill()
-        
+        self.intro_world.clear()
+        self.world.clear()
+
         # Set up player
-        Player.containers = (self.updatable, self.drawable)
         self.player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-        self.updatable.add(self.player)
-        self.drawable.add(self.player)
+        self.world.add(self.player)
 
-        # Set up asteroids
-        Asteroid.containers = (self.asteroids, self.updatable, self.drawable)
-        
-        # Set up shots
-        Shot.containers = (self.shots, self.updatable, self.drawable)
-        
         # Create a fresh asteroid field
-        AsteroidField.containers = (self.updatable,)
-        self.asteroid_field = AsteroidField()
+        if self.array_asteroids:
+            self.asteroid_store = AsteroidStore(self.rng, self.asteroid_sprites)
+            self.targets = self.asteroid_store
+            self.world.use_asteroid_store(self.asteroid_store)
+            self.asteroid_field = AsteroidField(self.asteroid_store, asteroid_class=ArrayAsteroid, rng=self.rng)
+        else:
+            self.asteroid_field = AsteroidField(self.world["asteroids"], rng=self.rng)
+        self.world.add(self.asteroid_field)
+        self.world.targets = self.targets
+        self.world.level = 1
+        self.asteroids = self.world["asteroids"]
+        self.shots = self.world["shots"]
 
         # Set up intro screen asteroids
         if self.intro_screen:
-            Asteroid.containers = (self.intro_asteroids, self.intro_updatable, self.intro_drawable)
-            AsteroidField.containers = (self.intro_updatable,)
-            self.intro_asteroid_field = AsteroidField()
+            # The intro runs for as long as the player waits, so it gets its
+            # own generator and leaves the game's streams untouched
+            self.intro_world.add(AsteroidField(self.intro_world["asteroids"], rng=GameRandom()))
         
         # Reset game state
         self.game_over = False
@@ -92,31 +147,31 @@ class Game:
         self.asteroids_for_next_level = 50
         self.level_up = False
         self.upgrade_options = []
-        self.rapid_fire_taken = False
-        self.super_rapid_fire_taken = False
-        self.ultra_rapid_fire_taken = False
-        self.dual_shot_taken = False
-        self.side_shot_taken = False
-        self.tracking_shots_taken = False
-        self.mega_rapid_fire_taken = False
-        self.forcefield_taken = False
+        self.upgrades_taken = set()
 
     def draw_score(self):
         # Draw score in top right
-        score_text = f"SCORE: {self.score}"
-        score_surface = self.score_font.render(score_text, True, "white")
-        score_rect = score_surface.get_rect(topright=(SCREEN_WIDTH - 20, 20))
-        self.screen.blit(score_surface, score_rect)
+        score_rect = self.text.draw_counter(self.screen, self.score_font, "SCORE: ", self.score,
+                                            topright=(SCREEN_WIDTH - 20, 20))
 
         # Draw level in top left
-        level_text = f"LEVEL: {self.level}"
-        level_surface = self.score_font.render(level_text, True, "white")
-        level_rect = level_surface.get_rect(topleft=(20, 20))
-        self.screen.blit(level_surface, level_rect)
+        level_rect = self.text.draw_counter(self.screen, self.score_font, "LEVEL: ", self.level, topleft=(20, 20))
+        return [score_rect, level_rect]
+
+    def draw_profiler(self):
+        # Recent per-frame averages under the level counter
+        rects = []
+        y = 60
+        for line in self.profiler.summary:
+            surface = self.text.render(self.tiny_font, line, "yellow")
+            rects.append(self.screen.blit(surface, (20, y)))
+            y += surface.get_height() + 4
+        return rects
 
     def check_level_up(self):
         if self.score >= self.asteroids_for_next_level:
             self.level += 1
+            self.world.level = self.level
             self.asteroids_for_next_level += 50
             self.level_up = True
             self.set_upgrade_options()
@@ -125,220 +180,7 @@ class Game:
                 self.player.reset_forcefield()
 
     def set_upgrade_options(self):
-        if self.level == 2:
-            # Level 2 always offers Dual Shot and Rapid Fire
-            self.upgrade_options = [
-                {
-                    "name": "Rapid Fire",
-                    "description": "Double your fire rate",
-                    "key": "1",
-                    "action": self.upgrade_rapid_fire
-                },
-                {
-                    "name": "Dual Shot",
-                    "description": "Shoot forward and backward",
-                    "key": "2",
-                    "action": self.upgrade_dual_shot
-                }
-            ]
-        elif self.level == 3:
-            self.upgrade_options = []
-            if self.dual_shot_taken:
-                # If Dual Shot was taken at level 2, offer Side Shots and Rapid Fire
-                self.upgrade_options = [
-                    {
-                        "name": "Rapid Fire",
-                        "description": "Double your fire rate",
-                        "key": "1",
-                        "action": self.upgrade_rapid_fire
-                    },
-                    {
-                        "name": "Side Shots",
-                        "description": "Shoot from both sides",
-                        "key": "2",
-                        "action": self.upgrade_side_shot
-                    }
-                ]
-            else:
-                # If Rapid Fire was taken at level 2, offer Dual Shot and Super Rapid Fire
-                self.upgrade_options = [
-                    {
-                        "name": "Dual Shot",
-                        "description": "Shoot forward and backward",
-                        "key": "1",
-                        "action": self.upgrade_dual_shot
-                    },
-                    {
-                        "name": "Super Rapid Fire",
-                        "description": "Double your fire rate again (4x total)",
-                        "key": "2",
-                        "action": self.upgrade_super_rapid_fire
-                    }
-                ]
-        elif self.level == 4:
-            self.upgrade_options = []
-            if self.dual_shot_taken and self.side_shot_taken:
-                # If both Dual Shot and Side Shots are taken, offer Rapid Fire and Tracking Shots
-                self.upgrade_options = [
-                    {
-                        "name": "Rapid Fire",
-                        "description": "Double your fire rate",
-                        "key": "1",
-                        "action": self.upgrade_rapid_fire
-                    },
-                    {
-                        "name": "Tracking Shots",
-                        "description": "Shots automatically target nearest asteroid",
-                        "key": "2",
-                        "action": self.upgrade_tracking_shots
-                    }
-                ]
-            elif self.dual_shot_taken and not self.side_shot_taken:
-                # If only Dual Shot is taken, offer Side Shots and Super Rapid Fire
-                self.upgrade_options = [
-                    {
-                        "name": "Side Shots",
-                        "description": "Shoot from both sides",
-                        "key": "1",
-                        "action": self.upgrade_side_shot
-                    },
-                    {
-                        "name": "Super Rapid Fire",
-                        "description": "Double your fire rate again (4x total)",
-                        "key": "2",
-                        "action": self.upgrade_super_rapid_fire
-                    }
-                ]
-            elif not self.dual_shot_taken and self.rapid_fire_taken:
-                # If only Rapid Fire is taken, offer Dual Shot and Ultra Rapid Fire
-                self.upgrade_options = [
-                    {
-                        "name": "Dual Shot",
-                        "description": "Shoot forward and backward",
-                        "key": "1",
-                        "action": self.upgrade_dual_shot
-                    },
-                    {
-                        "name": "Ultra Rapid Fire",
-                        "description": "Double your fire rate again (8x total)",
-                        "key": "2",
-                        "action": self.upgrade_ultra_rapid_fire
-                    }
-                ]
-        elif self.level == 5:
-            self.upgrade_options = []
-            if self.dual_shot_taken and self.side_shot_taken and self.tracking_shots_taken:
-                # If all directional upgrades are taken, offer Rapid Fire and Forcefield
-                self.upgrade_options = [
-                    {
-                        "name": "Rapid Fire",
-                        "description": "Double your fire rate",
-                        "key": "1",
-                        "action": self.upgrade_rapid_fire
-                    },
-                    {
-                        "name": "Forcefield",
-                        "description": "Create a ring of protective shots around your ship",
-                        "key": "2",
-                        "action": self.upgrade_forcefield
-                    }
-                ]
-            elif self.dual_shot_taken and self.side_shot_taken and not self.tracking_shots_taken:
-                # If Dual Shot and Side Shots are taken, offer Tracking Shots and Mega Rapid Fire
-                self.upgrade_options = [
-                    {
-                        "name": "Tracking Shots",
-                        "description": "Shots automatically target nearest asteroid",
-                        "key": "1",
-                        "action": self.upgrade_tracking_shots
-                    },
-                    {
-                        "name": "Mega Rapid Fire",
-                        "description": "Double your fire rate again (16x total)",
-                        "key": "2",
-                        "action": self.upgrade_mega_rapid_fire
-                    }
-                ]
-            elif not self.dual_shot_taken and self.rapid_fire_taken and self.super_rapid_fire_taken:
-                # If both Rapid Fire upgrades are taken, offer Dual Shot and Forcefield
-                self.upgrade_options = [
-                    {
-                        "name": "Dual Shot",
-                        "description": "Shoot forward and backward",
-                        "key": "1",
-                        "action": self.upgrade_dual_shot
-                    },
-                    {
-                        "name": "Forcefield",
-                        "description": "Create a ring of protective shots around your ship",
-                        "key": "2",
-                        "action": self.upgrade_forcefield
-                    }
-                ]
-            elif not self.dual_shot_taken and self.rapid_fire_taken and not self.super_rapid_fire_taken:
-                # If only Rapid Fire is taken, offer Super Rapid Fire and Forcefield
-                self.upgrade_options = [
-                    {
-                        "name": "Super Rapid Fire",
-                        "description": "Double your fire rate again (4x total)",
-                        "key": "1",
-                        "action": self.upgrade_super_rapid_fire
-                    },
-                    {
-                        "name": "Forcefield",
-                        "description": "Create a ring of protective shots around your ship",
-                        "key": "2",
-                        "action": self.upgrade_forcefield
-                    }
-                ]
-
-    def upgrade_rapid_fire(self):
-        self.player.fire_rate_multiplier = 2.0
-        self.rapid_fire_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_dual_shot(self):
-        self.player.dual_shot = True
-        self.dual_shot_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_super_rapid_fire(self):
-        self.player.fire_rate_multiplier *= 2.0
-        self.super_rapid_fire_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_side_shot(self):
-        self.player.side_shot = True
-        self.side_shot_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_ultra_rapid_fire(self):
-        self.player.fire_rate_multiplier *= 2.0
-        self.ultra_rapid_fire_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_tracking_shots(self):
-        self.player.tracking_shots = True
-        self.tracking_shots_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_mega_rapid_fire(self):
-        self.player.fire_rate_multiplier *= 2.0
-        self.mega_rapid_fire_taken = True
-        self.level_up = False
-        self.clear_asteroids()
-
-    def upgrade_forcefield(self):
-        self.player.forcefield = True
-        self.forcefield_taken = True
-        self.level_up = False
-        self.clear_asteroids()
+        self.upgrade_options = self.upgrade_tree.offers(self.level, self.upgrades_taken)
 
     def clear_asteroids(self):
         """Clear all asteroids and reset player position when starting a new level"""
@@ -348,78 +190,78 @@ class Game:
         
         # Reset player position and velocity
         self.player.position = pygame.math.Vector2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        self.player.previous_position = pygame.math.Vector2(self.player.position)
         self.player.velocity = pygame.math.Vector2(0, 0)
         self.player.rect.center = self.player.position
 
-    def handle_level_up(self):
+    def draw_level_up(self):
         # Draw level up text
         level_text = f"LEVEL {self.level} COMPLETE!"
-        level_surface = self.font.render(level_text, True, "white")
+        level_surface = self.text.render(self.font, level_text)
         level_rect = level_surface.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 100))
-        self.screen.blit(level_surface, level_rect)
+        rects = [self.screen.blit(level_surface, level_rect)]
 
         # Draw upgrade options with adjusted spacing
         for i, option in enumerate(self.upgrade_options):
             y_pos = SCREEN_HEIGHT/2 + i * 70  # Increased spacing for readability
             # Draw option name
-            name_surface = self.score_font.render(f"{option['key']}: {option['name']}", True, "white")
+            name_surface = self.text.render(self.score_font, f"{option['key']}: {option['name']}")
             name_rect = name_surface.get_rect(center=(SCREEN_WIDTH/2, y_pos))
-            self.screen.blit(name_surface, name_rect)
+            rects.append(self.screen.blit(name_surface, name_rect))
             
             # Draw description
-            desc_surface = self.small_font.render(option['description'], True, "white")
+            desc_surface = self.text.render(self.small_font, option['description'])
             desc_rect = desc_surface.get_rect(center=(SCREEN_WIDTH/2, y_pos + 40))
-            self.screen.blit(desc_surface, desc_rect)
+            rects.append(self.screen.blit(desc_surface, desc_rect))
+        return rects
 
-    def handle_game_over(self, dt):
+    def update_game_over(self, dt):
+        # Type out the game over text one letter at a time
         self.text_timer += dt
         if self.text_timer >= self.text_speed and self.text_progress < len(self.game_over_text):
             self.text_progress += 1
             self.text_timer = 0
 
+    def draw_game_over(self):
         # Draw game over text
         text = self.game_over_text[:self.text_progress]
-        text_surface = self.font.render(text, True, "white")
+        text_surface = self.text.render(self.font, text)
         text_rect = text_surface.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 50))
-        self.screen.blit(text_surface, text_rect)
+        rects = [self.screen.blit(text_surface, text_rect)]
 
         # Draw final score and level
         final_score_text = f"FINAL SCORE: {self.score}"
         final_level_text = f"LEVEL REACHED: {self.level}"
-        final_score_surface = self.score_font.render(final_score_text, True, "white")
-        final_level_surface = self.score_font.render(final_level_text, True, "white")
+        final_score_surface = self.text.render(self.score_font, final_score_text)
+        final_level_surface = self.text.render(self.score_font, final_level_text)
         final_score_rect = final_score_surface.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2))
         final_level_rect = final_level_surface.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 40))
-        self.screen.blit(final_score_surface, final_score_rect)
-        self.screen.blit(final_level_surface, final_level_rect)
+        rects.append(self.screen.blit(final_score_surface, final_score_rect))
+        rects.append(self.screen.blit(final_level_surface, final_level_rect))
 
         # Draw menu options
-        menu_text = self.small_font.render("PRESS R FOR MAIN MENU", True, "white")
-        exit_text = self.small_font.render("PRESS Q TO QUIT", True, "white")
+        menu_text = self.text.render(self.small_font, "PRESS R FOR MAIN MENU")
+        exit_text = self.text.render(self.small_font, "PRESS Q TO QUIT")
         menu_rect = menu_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 100))
         exit_rect = exit_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 150))
-        self.screen.blit(menu_text, menu_rect)
-        self.screen.blit(exit_text, exit_rect)
+        rects.append(self.screen.blit(menu_text, menu_rect))
+        rects.append(self.screen.blit(exit_text, exit_rect))
+        return rects
 
-    def handle_intro_screen(self, dt):
-        # Update intro asteroids
-        if self.intro_asteroid_field:
-            self.intro_asteroid_field.update(dt, 1)  # Use level 1 for consistent speed
-        
-        # Update all intro sprites
-        for sprite in self.intro_updatable:
-            if isinstance(sprite, Asteroid):
-                sprite.update(dt)
-        
+    def update_intro_screen(self, dt):
+        # Update intro asteroids, always at level 1 speed
+        self.intro_world.update(dt)
+
+    def draw_intro_screen(self, alpha=1.0):
         # Draw intro asteroids
-        for sprite in self.intro_drawable:
-            sprite.draw(self.screen)
+        self.intro_world.draw(self.canvas, alpha)
+        rects = self.canvas.finish()
 
         # Draw title
         title_text = "ASTEROIDS"
-        title_surface = self.font.render(title_text, True, "white")
+        title_surface = self.text.render(self.font, title_text)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/4))
-        self.screen.blit(title_surface, title_rect)
+        rects.append(self.screen.blit(title_surface, title_rect))
 
         # Draw controls with adjusted spacing for the new font
         controls = [
@@ -435,112 +277,374 @@ class Game:
 
         for i, text in enumerate(controls):
             y_pos = SCREEN_HEIGHT/2 + i * 35  # Reduced spacing for the pixel font
-            text_surface = self.small_font.render(text, True, "white")
+            text_surface = self.text.render(self.small_font, text)
             text_rect = text_surface.get_rect(center=(SCREEN_WIDTH/2, y_pos))
-            self.screen.blit(text_surface, text_rect)
+            rects.append(self.screen.blit(text_surface, text_rect))
+        return rects
 
     def start_game(self):
         # Clear intro asteroids
-        if self.intro_asteroid_field:
-            self.intro_asteroid_field.kill()
-            self.intro_asteroid_field = None
-        for asteroid in self.intro_asteroids:
-            asteroid.kill()
-        self.intro_asteroids.empty()
-        
-        # Reset asteroid containers for actual game
-        Asteroid.containers = (self.asteroids, self.updatable, self.drawable)
-        AsteroidField.containers = (self.updatable,)
+        self.intro_world.clear()
         self.intro_screen = False
-
-    def run(self):
+        if self.rewind is not None:
+            self.rewind.clear()
+
+    def handle_collisions(self):
+        if self.asteroid_store is not None:
+            self.handle_array_collisions()
+            return
+
+        # Rebuild the broadphase grid for this frame. It is also what
+        # tracking shots search for targets.
+        self.asteroid_grid.rebuild(self.asteroids)
+
+        # Collisions are swept over the whole last step, so fast shots can't
+        # pass through an asteroid between two steps. Contacts are resolved
+        # in the order they happened: a shot stops at the first asteroid it
+        # reached and an asteroid is destroyed by the first shot to reach it.
+        # The smaller group is checked against a grid of the larger one.
+        contacts = []
+        if len(self.shots) <= len(self.asteroids):
+            for shot in self.shots:
+                for t, sprite in self.asteroid_grid.impacts(shot):
+                    contacts.append((t, sprite, shot))
+        else:
+            self.shot_grid.rebuild(self.shots)
+            for sprite in self.asteroids:
+                for t, shot in self.shot_grid.impacts(sprite):
+                    contacts.append((t, sprite, shot))
+        contacts.sort(key=lambda contact: contact[0])
+        for t, sprite, shot in contacts:
+            if sprite.alive() and shot.alive():
+                sprite.split()
+                shot.kill()
+                self.score += 1
+                self.check_level_up()
+
+        for t, sprite in self.asteroid_grid.impacts(self.player):
+            self.handle_player_collision(sprite)
+
+    def handle_array_collisions(self):
+        # Vectorized equivalent of handle_collisions for the array engine
+        rows, hits = self.asteroid_store.collide_shots(self.shots)
+        for hit in hits:
+            hit.kill()
+            self.score += 1
+            self.check_level_up()
+        self.asteroid_store.split(rows)
+
+        for t, sprite in self.asteroid_store.impacts(self.player):
+            self.handle_player_collision(sprite)
+
+    def handle_player_collision(self, sprite):
+        # Check if forcefield can absorb the hit
+        if self.player.forcefield:  # First check if forcefield is active
+            # Calculate bounce direction
+            collision_vector = sprite.position - self.player.position
+            if collision_vector.length() > 0:  # Prevent division by zero
+                collision_vector = collision_vector.normalize()
+                # Move asteroid away from player to prevent sticking
+                sprite.position = self.player.position + collision_vector * (self.player.radius + sprite.radius + 5)
+                # The move is a jump, not movement the next sweep should test
+                sprite.previous_position = pygame.Vector2(sprite.position)
+                # Reverse and increase velocity
+                sprite.velocity = -collision_vector * sprite.velocity.length() * 1.5
+            # Handle forcefield hit and check if it's depleted
+            if not self.player.handle_forcefield_collision():
+                self.game_over = True
+        else:
+            self.game_over = True
+
+    def handle_events(self):
+        # Returns False once the player asks to quit
         running = True
-        while running:
-            dt = self.clock.tick(60) / 1000.0  # Convert to seconds
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                if self.intro_screen:
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_SPACE:
-                            self.start_game()
-                elif self.game_over:
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_r:
-                            self.intro_screen = True
-                            self.reset_game()
-                        elif event.key == pygame.K_q:
-                            running = False
-                elif self.level_up:
-                    if event.type == pygame.KEYDOWN:
-                        for option in self.upgrade_options:
-                            if event.unicode == option['key']:
-                                option['action']()
-                                break
-
-            # Render
-            self.screen.fill("black")
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.toggle_profiler()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE:
+                self.rewind_time(REWIND_STEP)
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # The window was uncovered, its contents have to be redrawn
+                self.renderer.invalidate()
             if self.intro_screen:
-                self.handle_intro_screen(dt)
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        self.start_game()
             elif self.game_over:
-                self.handle_game_over(dt)
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_r:
+                        self.intro_screen = True
+                        self.reset_game()
+                    elif event.key == pygame.K_q:
+                        running = False
             elif self.level_up:
-                self.handle_level_up()
-            else:
-                if not self.game_over and not self.level_up:
-                    # Handle shooting
-                    keys = pygame.key.get_pressed()
-                    if keys[pygame.K_SPACE]:
-                        new_shots = self.player.shoot()
-                        if new_shots:
-                            for shot in new_shots:
-                                self.shots.add(shot)
-                                self.updatable.add(shot)
-                                self.drawable.add(shot)
-                    
-                    # Handle collisions
-                    for sprite in self.asteroids:
-                        for hit in self.shots:
-                            if sprite.collision(hit):
-                                sprite.split()
-                                hit.kill()
-                                self.score += 1
-                                self.check_level_up()
-                        if sprite.collision(self.player):
-                            # Check if forcefield can absorb the hit
-                            if self.player.forcefield:  # First check if forcefield is active
-                                # Calculate bounce direction
-                                collision_vector = sprite.position - self.player.position
-                                if collision_vector.length() > 0:  # Prevent division by zero
-                                    collision_vector = collision_vector.normalize()
-                                    # Move asteroid away from player to prevent sticking
-                                    sprite.position = self.player.position + collision_vector * (self.player.radius + sprite.radius + 5)
-                                    # Reverse and increase velocity
-                                    sprite.velocity = -collision_vector * sprite.velocity.length() * 1.5
-                                # Handle forcefield hit and check if it's depleted
-                                if not self.player.handle_forcefield_collision():
-                                    self.game_over = True
-                            else:
-                                self.game_over = True
-
-                    # Update game
-                    for sprite in self.updatable:
-                        if isinstance(sprite, AsteroidField):
-                            sprite.update(dt, self.level)
-                        elif isinstance(sprite, Shot):
-                            sprite.update(dt, self.asteroids)
-                        else:
-                            sprite.update(dt)
-
-                for sprite in self.drawable:
-                    sprite.draw(self.screen)
-                self.draw_score()
-            
-            pygame.display.flip()
+                self.input.handle_event(event)
+        return running
+
+    def toggle_profiler(self):
+        # The overlay needs the profiler running; it keeps running while
+        # hidden if it is also exporting
+        self.show_profiler = not self.show_profiler
+        if self.show_profiler:
+            self.profiler.enable()
+        elif not self.profiler.export:
+            self.profiler.disable()
+
+    def rewind_time(self, seconds):
+        # Goes back `seconds` of play, out of a game over or level up too
+        if self.rewind is None or self.intro_screen:
+            return
+        self.rewind.rewind(self, round(seconds / self.step_dt))
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
+    def select_upgrade(self, key):
+        for option in self.upgrade_options:
+            if key == option['key']:
+                self.upgrade_tree.apply(option['id'], self.player)
+                self.upgrades_taken.add(option['id'])
+                self.finish_level_up()
+                break
+
+    def finish_level_up(self):
+        self.level_up = False
+        self.upgrade_options = []
+        self.clear_asteroids()
 
+    def step(self, dt):
+        # Advance the simulation by dt seconds
+        if self.intro_screen:
+            self.update_intro_screen(dt)
+        elif self.game_over:
+            self.update_game_over(dt)
+        elif self.level_up:
+            controls = self.input.poll()
+            if not self.upgrade_options:
+                # Every upgrade is taken, straight on to the next level
+                self.finish_level_up()
+            elif controls.upgrade:
+                self.select_upgrade(controls.upgrade)
+        else:
+            profiler = self.profiler
+            self.world.bind()
+            with profiler.scope("input"):
+                controls = self.input.poll()
+                self.player.controls = controls
+
+            # Handle shooting
+            if controls.shoot:
+                with profiler.scope("shoot"):
+                    for shot in self.player.shoot():
+                        self.world.add(shot)
+
+            # Handle collisions
+            with profiler.scope("collisions"):
+                self.handle_collisions()
+
+            # Update game
+            self.world.update(dt)
+            if self.rewind is not None:
+                with profiler.scope("rewind"):
+                    self.rewind.record(self)
+
+    def render(self, alpha=1.0):
+        # alpha is how far we are between the last two simulation steps,
+        # used to interpolate positions when running a fixed timestep.
+        # The game over and level up screens only change with their key, so
+        # frames that would repeat the last one aren't drawn or presented.
+        if self.intro_screen:
+            state, key = "intro", None
+        elif self.game_over:
+            state, key = "game_over", self.text_progress
+        elif self.level_up:
+            state, key = "level_up", (self.level, tuple(option['name'] for option in self.upgrade_options))
+        else:
+            state, key = "playing", None
+        if self.show_profiler:
+            key = None
+        if not self.renderer.begin(state, key):
+            return
+
+        if self.intro_screen:
+            rects = self.draw_intro_screen(alpha)
+        elif self.game_over:
+            rects = self.draw_game_over()
+        elif self.level_up:
+            rects = self.draw_level_up()
+        else:
+            self.world.draw(self.canvas, alpha)
+            with self.profiler.scope("canvas"):
+                rects = self.canvas.finish()
+            with self.profiler.scope("hud"):
+                rects += self.draw_score()
+        if self.show_profiler:
+            rects += self.draw_profiler()
+
+        with self.profiler.scope("flip"):
+            self.renderer.present(rects)
+
+    def end_frame(self):
+        # Closes the profiler's sample for this frame (a step when headless),
+        # with the text cache's hits and misses over the frame
+        hits, misses = self.text.hits, self.text.misses
+        if self.profiler.enabled:
+            world = self.intro_world if self.intro_screen else self.world
+            counts = world.counts()
+            counts["text_hits"] = hits - self.text_hits
+            counts["text_misses"] = misses - self.text_misses
+            self.profiler.end_frame(counts)
+        self.text_hits, self.text_misses = hits, misses
+
+    def run(self):
+        running = True
+        accumulator = 0.0
+        while running:
+            with self.profiler.scope("wait"):
+                frame_time = self.clock.tick(self.max_fps) / 1000.0  # Convert to seconds
+
+            with self.profiler.scope("events"):
+                running = self.handle_events()
+
+            if not self.fixed_timestep:
+                self.step(frame_time)
+                self.render()
+                self.end_frame()
+                continue
+
+            # Run as many fixed steps as the elapsed time covers. After a long
+            # hitch only max_steps are run and the rest of the backlog is
+            # dropped, so a slow frame can't snowball into a slower one.
+            accumulator += frame_time
+            steps = 0
+            while accumulator >= self.step_dt and steps < self.max_steps:
+                self.step(self.step_dt)
+                accumulator -= self.step_dt
+                steps += 1
+            if steps == self.max_steps:
+                accumulator = min(accumulator, self.step_dt)
+            self.render(accumulator / self.step_dt)
+            self.end_frame()
+
+        self.profiler.close()
         pygame.quit()
 
+    def new_game(self):
+        # Straight from game over into a fresh game, as if the player had
+        # pressed R and SPACE
+        self.intro_screen = True
+        self.reset_game()
+        self.start_game()
+
+    def run_headless(self, ticks, restart=False, checkpoint=None, first_tick=0):
+        # Run up to `ticks` fixed steps as fast as possible without drawing
+        # anything. Stops at game over unless restart is set, in which case a
+        # new game starts straight away. With a checkpoint file a snapshot is
+        # saved there every CHECKPOINT_INTERVAL steps and at the end, numbered
+        # from first_tick, for a long run to be resumed from if it dies.
+        # Returns the number of steps actually simulated.
+        if self.intro_screen:
+            self.start_game()
+        tick = 0
+        while tick < ticks:
+            if self.game_over:
+                if not restart:
+                    break
+                self.new_game()
+            self.step(self.step_dt)
+            self.end_frame()
+            tick += 1
+            if checkpoint and tick % CHECKPOINT_INTERVAL == 0:
+                save_snapshot(self, checkpoint, first_tick + tick)
+        if checkpoint:
+            save_snapshot(self, checkpoint, first_tick + tick)
+        return tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asteroids")
+    parser.add_argument("--headless", action="store_true", help="simulate without a window")
+    parser.add_argument("--ticks", type=int, default=SIMULATION_TICK_RATE * 60,
+                        help="simulation steps to run in headless mode")
+    parser.add_argument("--seed", type=int, help="seed for the random number generator")
+    parser.add_argument("--tick-rate", type=int, default=SIMULATION_TICK_RATE,
+                        help="simulation steps per second")
+    parser.add_argument("--array-asteroids", action="store_true",
+                        help="use the NumPy asteroid engine")
+    parser.add_argument("--effects", action="store_true",
+                        help="create explosions in headless mode (does not change the simulation)")
+    parser.add_argument("--polygon-asteroids", action="store_true",
+                        help="draw exact asteroid polygons instead of cached rotation frames")
+    parser.add_argument("--record", metavar="FILE", help="record player input to a replay file")
+    parser.add_argument("--replay", metavar="FILE", help="play back a replay file headless at full speed")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write per-frame timings to FILE (CSV for a .csv name, otherwise JSON lines)")
+    parser.add_argument("--full-redraw", action="store_true",
+                        help="repaint and flip the whole window every frame instead of only what changed")
+    parser.add_argument("--rewind", type=float, metavar="SECONDS",
+                        help=f"seconds of play BACKSPACE can rewind through, 0 to turn rewinding off "
+                             f"(default {REWIND_SECONDS} in a window, off in headless mode)")
+    parser.add_argument("--checkpoint", metavar="FILE",
+                        help="in headless mode, save a snapshot of the game to FILE every so often")
+    parser.add_argument("--resume", metavar="FILE",
+                        help="in headless mode, carry on from a snapshot saved with --checkpoint")
+    args = parser.parse_args()
+    if args.resume and args.record:
+        parser.error("a resumed game can't be recorded, its replay would start part way through")
+    profiler = Profiler(export=args.profile)
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        game = Game(array_asteroids=replay.array_asteroids, tick_rate=replay.tick_rate, seed=replay.seed,
+                    headless=True, input_source=ReplayInput(replay), effects=args.effects, profiler=profiler)
+        start = time.perf_counter()
+        ticks = game.run_headless(len(replay), restart=True)
+        report(game, ticks, time.perf_counter() - start)
+        return
+
+    seed = args.seed
+    if args.record and seed is None:
+        # A replay is only reproducible with a known seed
+        seed = random.randrange(2 ** 63)
+    input_source = ScriptedInput(autopilot) if args.headless else KeyboardInput()
+    if args.record:
+        recording = Replay(seed, args.tick_rate, args.array_asteroids)
+        input_source = InputRecorder(input_source, recording)
+
+    # Rewinding would leave a recording with input the game never played
+    rewind = 0 if args.record else args.rewind
+    game = Game(array_asteroids=args.array_asteroids, tick_rate=args.tick_rate, seed=seed,
+                headless=args.headless, input_source=input_source, effects=args.effects or None,
+                asteroid_sprites=not args.polygon_asteroids, profiler=profiler,
+                dirty_rects=not args.full_redraw, rewind_seconds=rewind)
+    if args.headless:
+        first_tick = 0
+        if args.resume:
+            # The autopilot script is a function of the step number
+            first_tick = input_source.tick = load_snapshot(game, args.resume)
+            print(f"resumed at tick {first_tick}")
+        start = time.perf_counter()
+        ticks = game.run_headless(args.ticks - first_tick, checkpoint=args.checkpoint, first_tick=first_tick)
+        report(game, ticks, time.perf_counter() - start)
+    else:
+        game.run()
+    if args.record:
+        recording.save(args.record)
+        print(f"recorded {len(recording)} ticks to {args.record}")
+
+
+def report(game, ticks, elapsed):
+    game.profiler.close()
+    pygame.quit()
+    print(f"ticks: {ticks}  score: {game.score}  level: {game.level}  game over: {game.game_over}")
+    print(f"{elapsed:.2f}s, {ticks / elapsed:.0f} ticks/sec")
+    for name, pool in game.pools.items():
+        stats = pool.stats()
+        print(f"{name} pool: {stats['created']} created, {stats['reused']} reused, high water {stats['high_water']}")
+    for name, timing in game.world.timings().items():
+        print(f"{name}: {timing['update'] * 1000:.0f}ms update, {timing['draw'] * 1000:.0f}ms draw")
+
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    main()
\ No newline at end of file
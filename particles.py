@@ -0,0 +1,90 @@
+import math
+from array import array
+from constants import PARTICLE_CAPACITY, EXPLOSION_LIFETIME
+
+
+# Explosion particles. Every particle is one line of an explosion: where it
+# starts, the offset to its far end and the time it was born, held in
+# preallocated arrays used as a ring. All particles live the same time and
+# are emitted in time order, so the live ones are always the run from the
+# oldest to the newest: a step only advances the clock and drops expired
+# particles off the old end, and a full ring overwrites the oldest. None of
+# it takes part in gameplay; asteroids, shots and collisions never see it.
+# World runs it as its explosions system (world.ParticleSystem).
+class Particles:
+    def __init__(self, capacity=PARTICLE_CAPACITY, lifetime=EXPLOSION_LIFETIME):
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.x = array("d", bytes(8 * capacity))
+        self.y = array("d", bytes(8 * capacity))
+        self.dx = array("d", bytes(8 * capacity))
+        self.dy = array("d", bytes(8 * capacity))
+        self.birth = array("d", bytes(8 * capacity))
+        self.clock = 0.0
+        self.head = 0  # particles ever emitted
+        self.tail = 0  # particles ever expired or overwritten
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def add(self, x, y, dx, dy, age=0.0):
+        # One particle, `age` seconds into its life
+        i = self.head % self.capacity
+        self.x[i] = x
+        self.y[i] = y
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.birth[i] = self.clock - age
+        self.head += 1
+        if self.head - self.tail > self.capacity:
+            self.tail = self.head - self.capacity
+
+    def emit(self, x, y, radius, rng, age=0.0):
+        # An explosion: 8 to 12 lines out from (x, y) of up to 1.5 radius
+        fx = rng.fx
+        for _ in range(fx.randint(8, 12)):
+            angle = fx.uniform(0, 2 * math.pi)
+            length = fx.uniform(radius * 0.5, radius * 1.5)
+            self.add(x, y, math.cos(angle) * length, math.sin(angle) * length, age)
+
+    def live(self):
+        # (x, y, dx, dy, age) of every live particle, oldest first
+        for n in range(self.tail, self.head):
+            i = n % self.capacity
+            yield self.x[i], self.y[i], self.dx[i], self.dy[i], self.clock - self.birth[i]
+
+    def update(self, dt):
+        self.clock += dt
+        expired = self.clock - self.lifetime
+        birth, capacity = self.birth, self.capacity
+        tail = self.tail
+        while tail < self.head and birth[tail % capacity] <= expired:
+            tail += 1
+        self.tail = tail
+
+    def draw(self, canvas):
+        # Each explosion's lines share a start and a birth, so they are drawn
+        # as one polyline going out and back along each of them, faded by
+        # age. The canvas blends the fade over what is underneath.
+        x, y, dx, dy, birth = self.x, self.y, self.dx, self.dy, self.birth
+        capacity, clock, lifetime = self.capacity, self.clock, self.lifetime
+        points = []
+        key = None
+        fade = 0
+        for n in range(self.tail, self.head):
+            i = n % capacity
+            start = (x[i], y[i])
+            if (start, birth[i]) != key:
+                if points:
+                    canvas.fade_lines(points, fade)
+                    points = []
+                key = (start, birth[i])
+                fade = int(255 * (1 - (clock - birth[i]) / lifetime))
+            if fade > 0:
+                points.append(start)
+                points.append((start[0] + dx[i], start[1] + dy[i]))
+        if points:
+            canvas.fade_lines(points, fade)
+
+    def clear(self):
+        self.tail = self.head
@@ -1,31 +1,35 @@
 import pygame
-from circleshape import CircleShape
-from shot import Shot
+from circleshape import CircleShape, interpolate
+from shot import Shot, TrackingShot, ForcefieldShot
+from controls import InputState
 from constants import PLAYER_RADIUS
 from constants import PLAYER_TURN_SPEED
 from constants import PLAYER_SPEED
 from constants import PLAYER_SHOOT_SPEED
 from constants import PLAYER_SHOOT_COOLDOWN
-import time
 from constants import SCREEN_WIDTH, SCREEN_HEIGHT
 
 
 class Player(pygame.sprite.Sprite):
+    system = "player"
+
     def __init__(self, x, y):
         super().__init__()
         self.image = pygame.Surface((30, 30), pygame.SRCALPHA)
         self.original_image = self.image
         self.rect = self.image.get_rect(center=(x, y))
         self.position = pygame.math.Vector2(x, y)
+        self.previous_position = pygame.math.Vector2(x, y)
         self.velocity = pygame.math.Vector2(0, 0)
         self.acceleration = pygame.math.Vector2(0, 0)
         self.angle = 0
         self.rotation_speed = PLAYER_TURN_SPEED
         self.max_speed = PLAYER_SPEED * 2  # Double the base speed
         self.acceleration_magnitude = PLAYER_SPEED * 3  # Triple the base speed for quick acceleration
-        self.drag = 0.98  # Reduced drag for better momentum
+        self.drag = 0.98  # Reduced drag for better momentum, applied per 1/60s
         self.fire_rate = 0.5  # seconds between shots
-        self.last_shot_time = 0
+        self.shot_timer = self.fire_rate  # simulation time since the last shot, starts ready to fire
+        self.trigger_held = False  # whether shoot was held last step
         self.fire_rate_multiplier = 1.0
         self.dual_shot = False
         self.side_shot = False
@@ -41,24 +45,27 @@ class Player(pygame.sprite.Sprite):
         self.forcefield_hits = 0  # Track number of hits the forcefield can take
         self.max_forcefield_hits = 2  # Maximum number of hits the forcefield can take
         self.forcefield_hit_cooldown = 0  # Cooldown timer for forcefield hits
+        self.controls = InputState()  # set by the game every simulation step
 
     def collision(self, other):
         # Use the radius for collision detection
         return self.position.distance_to(other.position) <= self.radius + other.radius
 
     def update(self, dt):
+        self.previous_position.update(self.position)
+
         # Handle rotation
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_a]:
+        controls = self.controls
+        if controls.left:
             self.angle += self.rotation_speed * dt
-        if keys[pygame.K_d]:
+        if controls.right:
             self.angle -= self.rotation_speed * dt
 
         # Handle acceleration
-        if keys[pygame.K_w]:
+        if controls.thrust:
             self.acceleration = pygame.math.Vector2(0, -self.acceleration_magnitude)
             self.acceleration.rotate_ip(-self.angle)
-        elif keys[pygame.K_s]:
+        elif controls.reverse:
             self.acceleration = pygame.math.Vector2(0, self.acceleration_magnitude)
             self.acceleration.rotate_ip(-self.angle)
         else:
@@ -66,7 +73,7 @@ class Player(pygame.sprite.Sprite):
 
         # Update velocity and position
         self.velocity += self.acceleration * dt
-        self.velocity *= self.drag
+        self.velocity *= self.drag ** (dt * 60)  # same drag per second at any step size
         if self.velocity.length() > self.max_speed:
             self.velocity.scale_to_length(self.max_speed)
         self.position += self.velocity * dt
@@ -97,7 +104,7 @@ class Player(pygame.sprite.Sprite):
             # Create new forcefield shots if needed
             while len(self.forcefield_shots) < self.forcefield_shot_count:
                 angle = self.forcefield_angle + (360 / self.forcefield_shot_count) * len(self.forcefield_shots)
-                shot = Shot(self.position.x, self.position.y, angle, is_forcefield=True)
+                shot = ForcefieldShot(self.position.x, self.position.y, angle)
                 self.forcefield_shots.append(shot)
 
             # Update forcefield shots
@@ -107,56 +114,77 @@ class Player(pygame.sprite.Sprite):
                 else:
                     self.forcefield_shots.remove(shot)
 
+        # Advance the weapon clock
+        self.shot_timer += dt
+        self.trigger_held = controls.shoot
+
         # Update forcefield hit cooldown
         if self.forcefield_hit_cooldown > 0:
             self.forcefield_hit_cooldown -= dt
 
     def shoot(self):
-        current_time = time.time()
-        if current_time - self.last_shot_time < self.fire_rate / self.fire_rate_multiplier:
-            return []
+        # Fire every volley that came due since the last step. When the
+        # cooldown is shorter than a step that is more than one; each volley
+        # is moved along by how long ago it was due so the shots stay evenly
+        # spaced at any frame rate.
+        cooldown = self.fire_rate / self.fire_rate_multiplier
+        if not self.trigger_held:
+            # A fresh press fires at once but an idle weapon doesn't bank shots
+            self.shot_timer = min(self.shot_timer, cooldown)
+        shots = []
+        while self.shot_timer >= cooldown:
+            self.shot_timer -= cooldown
+            shots.extend(self.fire_volley(self.shot_timer))
+        return shots
 
-        self.last_shot_time = current_time
+    def fire_volley(self, age):
         shots = []
 
         # Determine if this shot should be tracking
-        is_tracking = False
+        shot_class = Shot
         if self.tracking_shots:
             self.shot_counter = (self.shot_counter + 1) % 5
-            is_tracking = (self.shot_counter == 0)  # Every 5th shot is tracking
+            if self.shot_counter == 0:  # Every 5th shot is tracking
+                shot_class = TrackingShot
 
         # Forward shot
-        shots.append(Shot(self.position.x, self.position.y, self.angle, is_tracking=is_tracking))
+        shots.append(shot_class.create(self.position.x, self.position.y, self.angle))
 
         # Backward shot if dual shot is active
         if self.dual_shot:
-            shots.append(Shot(self.position.x, self.position.y, self.angle + 180, is_tracking=is_tracking))
+            shots.append(shot_class.create(self.position.x, self.position.y, self.angle + 180))
 
         # Side shots if side shot is active
         if self.side_shot:
-            shots.append(Shot(self.position.x, self.position.y, self.angle + 90, is_tracking=is_tracking))
-            shots.append(Shot(self.position.x, self.position.y, self.angle - 90, is_tracking=is_tracking))
+            shots.append(shot_class.create(self.position.x, self.position.y, self.angle + 90))
+            shots.append(shot_class.create(self.position.x, self.position.y, self.angle - 90))
+
+        if age > 0:
+            for shot in shots:
+                shot.position += shot.velocity * age
+                shot.previous_position.update(shot.position)
 
         return shots
 
-    def draw(self, screen):
+    def draw(self, canvas, alpha=1.0):
         # Draw the player triangle
+        position = interpolate(self.previous_position, self.position, alpha)
         forward = pygame.math.Vector2(0, -1).rotate(-self.angle)
         right = pygame.math.Vector2(1, 0).rotate(-self.angle)
         
         # Calculate triangle points
-        tip = self.position + forward * self.radius
-        left = self.position - forward * self.radius - right * self.radius
-        right_point = self.position - forward * self.radius + right * self.radius
+        tip = position + forward * self.radius
+        left = position - forward * self.radius - right * self.radius
+        right_point = position - forward * self.radius + right * self.radius
         
         # Draw the triangle
-        pygame.draw.polygon(screen, "white", [tip, left, right_point], 2)
+        canvas.outline([tip, left, right_point])
 
         # Draw forcefield shots if active
         if self.forcefield:
             for shot in self.forcefield_shots:
                 if shot.active:
-                    shot.draw(screen)
+                    shot.draw(canvas, alpha)
 
     def upgrade_forcefield(self):
         self.forcefield = True
@@ -165,24 +193,21 @@ class Player(pygame.sprite.Sprite):
         # Create initial forcefield shots
         for i in range(self.forcefield_shot_count):
             angle = (360 / self.forcefield_shot_count) * i
-            shot = Shot(self.position.x, self.position.y, angle, is_forcefield=True)
+            shot = ForcefieldShot(self.position.x, self.position.y, angle)
             self.forcefield_shots.append(shot)
 
     def handle_forcefield_collision(self):
         if self.forcefield and self.forcefield_hit_cooldown <= 0:
             self.forcefield_hits += 1
-            print(f"Forcefield hit! Hits taken: {self.forcefield_hits}")  # Debug print
             self.forcefield_hit_cooldown = 0.5  # Set cooldown to 0.5 seconds
             
             if self.forcefield_hits >= self.max_forcefield_hits:
                 # Forcefield is depleted
-                print("Forcefield depleted!")  # Debug print
                 self.forcefield = False
                 self.forcefield_shots = []
                 return False
             elif self.forcefield_hits == 1:
                 # After first hit, reduce to half the shots
-                print("Forcefield weakened!")  # Debug print
                 remaining_shots = []
                 for i in range(0, len(self.forcefield_shots), 2):
                     if i < len(self.forcefield_shots):
@@ -199,5 +224,5 @@ class Player(pygame.sprite.Sprite):
             # Create new forcefield shots
             for i in range(self.forcefield_shot_count):
                 angle = (360 / self.forcefield_shot_count) * i
-                shot = Shot(self.position.x, self.position.y, angle, is_forcefield=True)
+                shot = ForcefieldShot(self.position.x, self.position.y, angle)
                 self.forcefield_shots.append(shot)
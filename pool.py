@@ -0,0 +1,74 @@
+# Object pools for short lived game objects. A killed object goes back to its
+# class's pool and a later create() re-initializes it with reset() instead
+# of allocating a new one, which keeps garbage collection pauses out of
+# heavy firefights.
+#
+# Released objects only become reusable after flush(), which the game calls
+# once per step. Code still holding a sprite killed earlier in the same step
+# (collision passes, split) never sees it come back as something else.
+class Pool:
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.pending = []  # released this step
+        self.created = 0  # objects ever allocated
+        self.reused = 0  # create() calls served from the free list
+        self.live = 0
+        self.high_water = 0  # most objects live at once
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        obj.pooled = False
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return obj
+
+    def release(self, obj):
+        if obj.pooled:
+            return
+        obj.pooled = True
+        obj.generation += 1
+        self.live -= 1
+        self.pending.append(obj)
+
+    def flush(self):
+        self.free.extend(self.pending)
+        self.pending.clear()
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "live": self.live,
+            "free": len(self.free) + len(self.pending),
+            "high_water": self.high_water,
+        }
+
+
+class Pooled:
+    # Mixin for sprites that can be pooled. Subclasses implement reset() with
+    # the same arguments as __init__ and are made through create(). Slotted
+    # subclasses need a "pooled" slot set to True and a "generation" slot set
+    # to 0 in __init__.
+    __slots__ = ()
+    pool = None
+    pooled = True  # not handed out by a pool, so kill() won't return it
+    generation = 0  # times released back to the pool
+
+    @classmethod
+    def create(cls, *args, **kwargs):
+        if cls.pool is None:
+            return cls(*args, **kwargs)
+        return cls.pool.acquire(*args, **kwargs)
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
@@ -0,0 +1,161 @@
+import csv
+import gc
+import json
+import time
+from collections import deque
+from constants import PROFILER_WINDOW, PROFILER_OVERLAY_REFRESH
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_SCOPE = _NullScope()
+
+
+# Per-frame timing. Phases of a frame are wrapped in named scopes,
+#   with profiler.scope("collisions"):
+#       ...
+# and end_frame() closes the frame into one sample: the time of every scope,
+# the entity counts passed in, and how long the garbage collector paused the
+# game. Samples are kept for the overlay and optionally streamed to a file
+# as they are taken, as JSON lines or, for a path ending in .csv, CSV. A CSV
+# has one set of columns for the whole file, so the scopes and counts a frame
+# can report are declared up front and the header is written with the first
+# sample; a declared column a frame doesn't report is left empty. While
+# disabled a scope is a shared no-op and end_frame returns straight away.
+class Profiler:
+    def __init__(self, enabled=False, export=None):
+        self.enabled = False
+        self.export = export
+        self.frame = 0
+        self.times = {}  # scope name -> seconds this frame
+        self.frame_start = time.perf_counter()
+        self.gc_start = 0.0
+        self.gc_pause = 0.0  # seconds this frame
+        self.gc_collections = 0
+        self.samples = deque(maxlen=PROFILER_WINDOW)
+        self.summary = []  # overlay lines, refreshed every few frames
+        self.columns = ["frame", "frame_ms", "gc_ms", "gc_collections"]  # CSV columns, see declare()
+        self.writer = None  # CSV writer, once the header is written
+        self.dropped = set()  # keys samples had that aren't CSV columns
+        self.file = open(export, "w", newline="") if export else None
+        if enabled or export:
+            self.enable()
+
+    def declare(self, scopes=(), counts=()):
+        # Names of the scopes and counts samples can hold, for the CSV columns
+        for key in [name + "_ms" for name in scopes] + list(counts):
+            if key not in self.columns:
+                self.columns.append(key)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.times = {}
+        self.frame_start = time.perf_counter()
+        gc.callbacks.append(self._gc_callback)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        gc.callbacks.remove(self._gc_callback)
+
+    def _gc_callback(self, phase, info):
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        else:
+            self.gc_pause += time.perf_counter() - self.gc_start
+            self.gc_collections += 1
+
+    def scope(self, name):
+        if not self.enabled:
+            return NULL_SCOPE
+        return _Scope(self, name)
+
+    def add(self, name, seconds):
+        self.times[name] = self.times.get(name, 0.0) + seconds
+
+    def end_frame(self, counts=None):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        sample = {"frame": self.frame, "frame_ms": (now - self.frame_start) * 1000,
+                  "gc_ms": self.gc_pause * 1000, "gc_collections": self.gc_collections}
+        for name, seconds in self.times.items():
+            sample[name + "_ms"] = seconds * 1000
+        if counts:
+            sample.update(counts)
+        self.samples.append(sample)
+        if self.file is not None:
+            self._write(sample)
+        if self.frame % PROFILER_OVERLAY_REFRESH == 0:
+            self.summary = self._summarize()
+
+        self.frame += 1
+        self.times = {}
+        self.gc_pause = 0.0
+        self.gc_collections = 0
+        self.frame_start = now
+
+    def _write(self, sample):
+        if not self.export.endswith(".csv"):
+            self.file.write(json.dumps(sample) + "\n")
+            return
+        if self.writer is None:
+            self.declare(counts=sample)
+            self.writer = csv.DictWriter(self.file, list(self.columns), restval="", extrasaction="ignore")
+            self.writer.writeheader()
+        undeclared = sample.keys() - self.writer.fieldnames - self.dropped
+        if undeclared:
+            print(f"Warning: undeclared profiler columns not exported: {', '.join(sorted(undeclared))}")
+            self.dropped |= undeclared
+        self.writer.writerow(sample)
+
+    def _summarize(self):
+        # Averages over the recent window, timings first, then counts
+        totals = {}
+        for sample in self.samples:
+            for key, value in sample.items():
+                totals[key] = totals.get(key, 0) + value
+        n = len(self.samples)
+        frame_ms = totals["frame_ms"] / n
+        lines = [f"{1000 / frame_ms if frame_ms else 0:.0f} FPS  {frame_ms:.2f}MS"]
+        for key in sorted(totals):
+            if key in ("frame", "frame_ms"):
+                continue
+            if key.endswith("_ms"):
+                lines.append(f"{key[:-3].upper()} {totals[key] / n:.2f}MS")
+        for key in sorted(totals):
+            if key != "frame" and not key.endswith("_ms"):
+                lines.append(f"{key.upper()} {totals[key] / n:.0f}")
+        return lines
+
+    def close(self):
+        self.disable()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
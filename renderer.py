@@ -0,0 +1,69 @@
+import pygame
+from constants import DIRTY_RECT_THRESHOLD
+
+
+# Presents frames by updating only the parts of the window that changed.
+# Every draw call returns the rect it touched; at the start of a frame the
+# rects drawn last frame are erased to the background, and at the end both
+# sets are handed to pygame.display.update. Once the changed area passes
+# `threshold` of the screen a single flip is cheaper, so the whole window is
+# presented instead. A frame whose key matches the last presented one is
+# skipped altogether, which lets static screens such as game over stop
+# redrawing. With dirty rects off every frame is a full fill and flip, but
+# unchanged frames are still skipped.
+class DirtyRenderer:
+    def __init__(self, screen, dirty_rects=True, threshold=DIRTY_RECT_THRESHOLD, background="black"):
+        self.screen = screen
+        self.dirty_rects = dirty_rects
+        self.threshold = threshold
+        self.background = background
+        self.area = screen.get_width() * screen.get_height()
+        self.previous = []  # rects drawn in the last presented frame
+        self.state = None
+        self.key = None
+        self.full = True  # the next frame repaints and presents the whole screen
+        self.presented = 0
+        self.full_presents = 0
+        self.skipped = 0
+
+    def invalidate(self):
+        # The window contents were lost, e.g. uncovered or resized
+        self.full = True
+
+    def begin(self, state, key=None):
+        # Prepares the screen for a frame of `state`. key identifies what a
+        # static frame shows, None for frames that always change. Returns
+        # False when the frame would be identical to the last one presented,
+        # in which case nothing should be drawn.
+        if state != self.state:
+            self.state = state
+            self.full = True
+        elif key is not None and key == self.key and not self.full:
+            self.skipped += 1
+            return False
+        self.key = key
+        if self.full or not self.dirty_rects:
+            self.screen.fill(self.background)
+        else:
+            for rect in self.previous:
+                self.screen.fill(self.background, rect)
+        return True
+
+    def present(self, rects):
+        # Shows the frame; rects are everything drawn since begin
+        self.presented += 1
+        if self.full or not self.dirty_rects:
+            pygame.display.flip()
+            self.full_presents += 1
+        else:
+            dirty = self.previous + rects
+            if sum(rect.width * rect.height for rect in dirty) > self.area * self.threshold:
+                pygame.display.flip()
+                self.full_presents += 1
+            else:
+                pygame.display.update(dirty)
+        self.full = False
+        self.previous = rects
+
+    def stats(self):
+        return {"presented": self.presented, "full": self.full_presents, "skipped": self.skipped}
@@ -0,0 +1,126 @@
+import struct
+from controls import InputState
+
+# Replay file layout (little endian):
+#   header  magic "ASTR", version, flags, seed, tick rate, tick count
+#   runs    (input byte, repeat count) pairs, run-length encoding the input
+#           byte of every simulation step
+# Each input byte packs the held controls into the low five bits and the
+# upgrade key pressed that step ("1"-"7", 0 for none) into the top three.
+MAGIC = b"ASTR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBqHI")
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+FLAG_ARRAY_ASTEROIDS = 1
+
+THRUST = 1
+REVERSE = 2
+LEFT = 4
+RIGHT = 8
+SHOOT = 16
+UPGRADE_SHIFT = 5
+
+
+def encode(state):
+    code = 0
+    if state.thrust:
+        code |= THRUST
+    if state.reverse:
+        code |= REVERSE
+    if state.left:
+        code |= LEFT
+    if state.right:
+        code |= RIGHT
+    if state.shoot:
+        code |= SHOOT
+    if state.upgrade and state.upgrade in "1234567":
+        code |= int(state.upgrade) << UPGRADE_SHIFT
+    return code
+
+
+def decode(code):
+    upgrade = code >> UPGRADE_SHIFT
+    return InputState(
+        thrust=bool(code & THRUST),
+        reverse=bool(code & REVERSE),
+        left=bool(code & LEFT),
+        right=bool(code & RIGHT),
+        shoot=bool(code & SHOOT),
+        upgrade=str(upgrade) if upgrade else None,
+    )
+
+
+class Replay:
+    def __init__(self, seed, tick_rate, array_asteroids=False, codes=None):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.array_asteroids = array_asteroids
+        self.codes = bytearray() if codes is None else codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def save(self, path):
+        flags = FLAG_ARRAY_ASTEROIDS if self.array_asteroids else 0
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, flags, self.seed, self.tick_rate, len(self.codes)))
+            i = 0
+            while i < len(self.codes):
+                code = self.codes[i]
+                run = 1
+                while i + run < len(self.codes) and self.codes[i + run] == code and run < MAX_RUN:
+                    run += 1
+                f.write(RUN.pack(code, run))
+                i += run
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, flags, seed, tick_rate, ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        codes = bytearray()
+        for code, run in RUN.iter_unpack(data[HEADER.size:]):
+            codes += bytes((code,)) * run
+        if len(codes) != ticks:
+            raise ValueError(f"{path} is truncated: expected {ticks} ticks, found {len(codes)}")
+        return cls(seed, tick_rate, bool(flags & FLAG_ARRAY_ASTEROIDS), codes)
+
+
+class InputRecorder:
+    # Wraps another input source and records what it returned every step
+    def __init__(self, source, replay):
+        self.source = source
+        self.replay = replay
+
+    def handle_event(self, event):
+        self.source.handle_event(event)
+
+    def poll(self):
+        state = self.source.poll()
+        self.replay.codes.append(encode(state))
+        return state
+
+
+class ReplayInput:
+    # Plays back a recorded replay one step at a time
+    def __init__(self, replay):
+        self.replay = replay
+        self.tick = 0
+
+    @property
+    def finished(self):
+        return self.tick >= len(self.replay.codes)
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        if self.finished:
+            return InputState()
+        state = decode(self.replay.codes[self.tick])
+        self.tick += 1
+        return state
@@ -0,0 +1,17 @@
+import random
+
+
+# Per-game random number generator. Gameplay randomness (spawn edges,
+# speeds, split angles) and cosmetic randomness (asteroid outlines and spin,
+# explosion lines) come from separate streams, so turning effects off or
+# changing how something looks never changes what happens in the game.
+class GameRandom:
+    def __init__(self, seed=None):
+        self.seed = seed
+        root = random.Random(seed)
+        self.sim = random.Random(root.getrandbits(64))  # affects gameplay
+        self.fx = random.Random(root.getrandbits(64))  # cosmetic only
+
+
+# Used by objects created outside of a Game, e.g. in scripts
+default_rng = GameRandom()
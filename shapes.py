@@ -0,0 +1,58 @@
+import math
+import random
+from constants import ASTEROID_MIN_RADIUS, ASTEROID_KINDS, ASTEROID_SHAPE_VARIANTS, ASTEROID_SHAPE_SEED
+
+MAX_VERTICES = 12
+
+
+def outline(radius, rng):
+    # 8 to 12 vertices evenly spaced around a circle, each 0.7 to 1.3 times
+    # the radius out
+    count = rng.randint(8, 12)
+    vertices = []
+    for i in range(count):
+        variation = rng.uniform(0.7, 1.3)
+        angle = (i / count) * 2 * math.pi
+        vertices.append((math.cos(angle) * radius * variation, math.sin(angle) * radius * variation))
+    return tuple(vertices)
+
+
+# Every asteroid outline, made once and shared. Each radius gets `variants`
+# outlines and an asteroid only keeps the shape id of the one it was given,
+# drawing it at its own position and rotation. Outlines are tuples of (x, y)
+# vertices and never change, so any number of asteroids, stores and games can
+# use them at once. The radius of every asteroid kind is built up front;
+# other radii get theirs the first time they are asked for. A radius's
+# outlines only depend on the seed, not on what was built before, so a
+# (radius, variant) pair names the same outline in every process.
+class ShapeLibrary:
+    def __init__(self, variants=ASTEROID_SHAPE_VARIANTS, seed=ASTEROID_SHAPE_SEED):
+        self.variants = variants
+        self.seed = seed
+        self.shapes = []  # shape id -> vertices
+        self.variant = []  # shape id -> its place among its radius's outlines
+        self.by_radius = {}  # radius -> shape ids
+        for kind in range(1, ASTEROID_KINDS + 1):
+            self.shape_ids(ASTEROID_MIN_RADIUS * kind)
+
+    def shape_ids(self, radius):
+        ids = self.by_radius.get(radius)
+        if ids is None:
+            rng = random.Random(f"{self.seed}:{float(radius)}")
+            ids = self.by_radius[radius] = tuple(range(len(self.shapes), len(self.shapes) + self.variants))
+            for variant in range(self.variants):
+                self.shapes.append(outline(radius, rng))
+                self.variant.append(variant)
+        return ids
+
+    def pick(self, radius, rng):
+        # A random outline for a new asteroid, from the cosmetic stream
+        ids = self.shape_ids(radius)
+        return ids[rng.fx.randrange(len(ids))]
+
+    def shape(self, radius, variant):
+        ids = self.shape_ids(radius)
+        return ids[variant % len(ids)]
+
+
+default_library = ShapeLibrary()
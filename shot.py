@@ -1,103 +1,154 @@
 import pygame
 import math
-from circleshape import CircleShape
-from constants import SHOT_RADIUS, SCREEN_WIDTH, SCREEN_HEIGHT
+from circleshape import interpolate
+from constants import SHOT_RADIUS, SCREEN_WIDTH, SCREEN_HEIGHT, TRACKING_SHOT_RANGE
+from entity import Entity
+from pool import Pooled
 
-class Shot(pygame.sprite.Sprite):
-    def __init__(self, x, y, angle, is_forcefield=False, is_tracking=False):
+# Shots are the most numerous objects in the game, so they are slotted
+# entities rather than sprites, with one class per kind of shot:
+#   Shot           - flies straight
+#   TrackingShot   - steers towards the nearest asteroid
+#   ForcefieldShot - orbits the player, positioned by Player.update
+
+class Shot(Pooled, Entity):
+    __slots__ = ("position", "previous_position", "velocity", "angle", "pooled", "generation")
+    system = "shots"
+    radius = SHOT_RADIUS  # For collision detection
+    active = True
+    is_forcefield = False
+    is_tracking = False
+
+    def __init__(self, x, y, angle):
         super().__init__()
-        self.image = pygame.Surface((8, 4), pygame.SRCALPHA)  # Changed size for rocket shape
-        self.rect = self.image.get_rect(center=(x, y))
+        self.pooled = True
+        self.generation = 0
         self.position = pygame.math.Vector2(x, y)
-        self.velocity = pygame.math.Vector2(0, -1).rotate(-angle) * 500
-        self.is_forcefield = is_forcefield
-        self.is_tracking = is_tracking
-        self.active = True
-        self.forcefield_angle = angle
-        self.forcefield_radius = 50
-        self.radius = SHOT_RADIUS  # For collision detection
-        self.turn_speed = 180  # degrees per second for tracking shots
+        self.previous_position = pygame.math.Vector2(x, y)
+        self.velocity = pygame.math.Vector2(0, -1)
+        self.reset(x, y, angle)
+
+    def reset(self, x, y, angle):
+        # Re-initializes a pooled shot in place
+        self.position.update(x, y)
+        self.previous_position.update(x, y)
+        self.velocity.update(0, -500)
+        self.velocity.rotate_ip(-angle)
         self.angle = angle  # Store angle for drawing
 
-    def update(self, dt, asteroids=None):
-        if not self.active:
-            return
-
-        if self.is_forcefield:
-            # Forcefield shots are updated by the player
-            return
-
-        if self.is_tracking and asteroids:
-            # Find nearest asteroid
-            nearest_asteroid = None
-            min_distance = float('inf')
-            for asteroid in asteroids:
-                distance = self.position.distance_to(asteroid.position)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_asteroid = asteroid
-
-            if nearest_asteroid:
-                # Calculate direction to nearest asteroid
-                direction = nearest_asteroid.position - self.position
-                target_angle = math.degrees(math.atan2(-direction.y, direction.x))
-                
-                # Calculate current angle
-                current_angle = math.degrees(math.atan2(-self.velocity.y, self.velocity.x))
-                
-                # Calculate angle difference
-                angle_diff = (target_angle - current_angle) % 360
-                if angle_diff > 180:
-                    angle_diff -= 360
-                
-                # Limit turn rate
-                max_turn = self.turn_speed * dt
-                if abs(angle_diff) > max_turn:
-                    angle_diff = max_turn if angle_diff > 0 else -max_turn
-                
-                # Update velocity direction
-                self.velocity = self.velocity.rotate(angle_diff)
-                self.angle = current_angle + angle_diff  # Update angle for drawing
+    def update(self, dt, targets=None):
+        self.previous_position.update(self.position)
 
         # Update position
         self.position += self.velocity * dt
-        self.rect.center = self.position
 
         # Remove if off screen
-        if (self.rect.right < 0 or self.rect.left > SCREEN_WIDTH or
-            self.rect.bottom < 0 or self.rect.top > SCREEN_HEIGHT):
+        x, y = self.position
+        radius = self.radius
+        if x + radius < 0 or x - radius > SCREEN_WIDTH or y + radius < 0 or y - radius > SCREEN_HEIGHT:
             self.kill()
 
-    def update_position(self, player_position, radius, base_angle):
-        if not self.active:
-            return
+    def draw(self, canvas, alpha=1.0):
+        # Draw regular shot as circle
+        position = interpolate(self.previous_position, self.position, alpha)
+        canvas.circle(position, self.radius)
+
+
+class TrackingShot(Shot):
+    __slots__ = ("target", "target_generation")
+    pool = None  # pooled separately from plain shots
+    is_tracking = True
+    turn_speed = 180  # degrees per second
+
+    def reset(self, x, y, angle):
+        super().reset(x, y, angle)
+        self.target = None  # asteroid this shot is locked onto
+        self.target_generation = 0
+
+    def lock(self, target):
+        self.target = target
+        self.target_generation = target.generation if target is not None else 0
+        return target
+
+    def locked_target(self):
+        # The asteroid this shot is locked onto, None once it died, including
+        # when its pool has since handed it out again as another asteroid
+        target = self.target
+        if target is None or not target.alive() or target.generation != self.target_generation:
+            return None
+        return target
+
+    def update(self, dt, targets=None):
+        if targets is not None:
+            self.steer(dt, targets)
+        super().update(dt)
+
+    def steer(self, dt, targets):
+        # Stay locked onto the current target, only look for the nearest
+        # asteroid in the shared index when it dies or gets out of range
+        target = self.locked_target()
+        if target is None or self.position.distance_to(target.position) > TRACKING_SHOT_RANGE:
+            target = self.lock(targets.nearest(self.position, TRACKING_SHOT_RANGE))
+
+        if target:
+            # Calculate direction to the target
+            direction = target.position - self.position
+            target_angle = math.degrees(math.atan2(-direction.y, direction.x))
+
+            # Calculate current angle
+            current_angle = math.degrees(math.atan2(-self.velocity.y, self.velocity.x))
 
+            # Calculate angle difference
+            angle_diff = (target_angle - current_angle) % 360
+            if angle_diff > 180:
+                angle_diff -= 360
+
+            # Limit turn rate
+            max_turn = self.turn_speed * dt
+            if abs(angle_diff) > max_turn:
+                angle_diff = max_turn if angle_diff > 0 else -max_turn
+
+            # Update velocity direction
+            self.velocity.rotate_ip(angle_diff)
+            self.angle = current_angle + angle_diff  # Update angle for drawing
+
+    def draw(self, canvas, alpha=1.0):
+        # Draw rocket shape
+        position = interpolate(self.previous_position, self.position, alpha)
+        forward = pygame.math.Vector2(0, -1).rotate(-self.angle)
+        right = pygame.math.Vector2(1, 0).rotate(-self.angle)
+
+        # Calculate rocket points
+        tip = position + forward * 4
+        left_wing = position - forward * 2 - right * 2
+        right_wing = position - forward * 2 + right * 2
+        back = position - forward * 4
+
+        # Draw rocket body
+        canvas.outline([tip, left_wing, back, right_wing])
+
+        # Draw rocket trail
+        trail_start = back
+        trail_end = back - forward * 3
+        canvas.outline([trail_start, trail_end], closed=False, width=1)
+
+
+class ForcefieldShot(Shot):
+    __slots__ = ("forcefield_angle",)
+    pool = None  # orbs live as long as the forcefield, they aren't pooled
+    is_forcefield = True
+
+    def reset(self, x, y, angle):
+        super().reset(x, y, angle)
+        self.forcefield_angle = angle  # offset from the rotating forcefield angle
+
+    def update(self, dt, targets=None):
+        # Forcefield shots are updated by the player
+        pass
+
+    def update_position(self, player_position, radius, base_angle):
         # Calculate new position based on forcefield angle and radius
+        self.previous_position.update(self.position)
         angle_rad = math.radians(self.forcefield_angle + base_angle)
         self.position.x = player_position.x + math.cos(angle_rad) * radius
         self.position.y = player_position.y + math.sin(angle_rad) * radius
-        self.rect.center = self.position
-
-    def draw(self, screen):
-        if self.active:
-            if self.is_tracking:
-                # Draw rocket shape
-                forward = pygame.math.Vector2(0, -1).rotate(-self.angle)
-                right = pygame.math.Vector2(1, 0).rotate(-self.angle)
-                
-                # Calculate rocket points
-                tip = self.position + forward * 4
-                left_wing = self.position - forward * 2 - right * 2
-                right_wing = self.position - forward * 2 + right * 2
-                back = self.position - forward * 4
-                
-                # Draw rocket body
-                pygame.draw.polygon(screen, "white", [tip, left_wing, back, right_wing], 2)
-                
-                # Draw rocket trail
-                trail_start = back
-                trail_end = back - forward * 3
-                pygame.draw.line(screen, "white", trail_start, trail_end, 1)
-            else:
-                # Draw regular shot as circle
-                pygame.draw.circle(screen, "white", self.position, self.radius, 2)
\ No newline at end of file
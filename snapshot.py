@@ -0,0 +1,297 @@
+import os
+import struct
+from asteroid import Asteroid
+from shot import Shot, TrackingShot, ForcefieldShot
+
+try:
+    import numpy as np
+except ImportError:  # only the array engine's fast path needs it
+    np = None
+
+# Snapshot layout (little endian), everything a game in progress needs to
+# carry on exactly as it would have:
+#   header      magic "ASTS", version, flags, tick, score, level, score for
+#               the next level, upgrades taken (a bit per upgrade in file
+#               order), game over text progress and timer, record counts
+#   field       spawn timer and difficulty settings
+#   player      pose, weapon clock and upgrade flags
+#   rng         the gameplay and cosmetic Mersenne Twister states
+#   asteroids   one fixed size record each, naming its outline by radius and
+#               variant in the shape library
+#   shots       plain and tracking, with the index of the asteroid tracked
+#   orbs        forcefield shots
+#   particles   explosion lines, oldest first
+# Particles are kept in single precision; everything the simulation reads
+# is kept exactly.
+MAGIC = b"ASTS"
+VERSION = 3
+HEADER = struct.Struct("<4sBBQIHIIBdIIBI")
+FIELD = struct.Struct("<5dIIB")
+PLAYER = struct.Struct("<11d5?2B")
+RNG = struct.Struct("<625I?d")
+ASTEROID = struct.Struct("<9dI")
+SHOT = struct.Struct("<B7di")
+ORB = struct.Struct("<5d")
+PARTICLE = struct.Struct("<5f")
+
+FLAG_ARRAY_ASTEROIDS = 1
+FLAG_GAME_OVER = 2
+FLAG_LEVEL_UP = 4
+
+SHOT_KINDS = (Shot, TrackingShot)
+
+if np is not None:
+    # The same record as ASTEROID, for reading and writing a whole
+    # AsteroidStore at once
+    ASTEROID_DTYPE = np.dtype([
+        ("position", "<f8", 2), ("previous_position", "<f8", 2), ("velocity", "<f8", 2),
+        ("radius", "<f8"), ("rotation", "<f8"), ("rotation_speed", "<f8"),
+        ("variant", "<u4"),
+    ])
+    assert ASTEROID_DTYPE.itemsize == ASTEROID.size
+
+
+def size(asteroids, shots, orbs, particles):
+    return (HEADER.size + FIELD.size + PLAYER.size + 2 * RNG.size + asteroids * ASTEROID.size
+            + shots * SHOT.size + orbs * ORB.size + particles * PARTICLE.size)
+
+
+def write(game, buffer, tick=0):
+    # Writes a snapshot of a game in progress into the bytearray `buffer`,
+    # growing it if it is too small, and returns the snapshot's size.
+    # `tick` is stored as is, for the caller to know where the game was.
+    if game.intro_screen:
+        raise ValueError("only a game in progress can be snapshotted")
+    player = game.player
+    field = game.asteroid_field
+    store = game.asteroid_store
+    asteroids = game.asteroids if store is None else None
+    shots = game.shots
+    orbs = player.forcefield_shots
+    particles = game.world.particles
+    asteroid_count = len(asteroids) if store is None else store.count
+    needed = size(asteroid_count, len(shots), len(orbs), len(particles))
+    if len(buffer) < needed:
+        buffer.extend(bytes(needed - len(buffer)))
+
+    flags = ((FLAG_ARRAY_ASTEROIDS if store is not None else 0) | (FLAG_GAME_OVER if game.game_over else 0)
+             | (FLAG_LEVEL_UP if game.level_up else 0))
+    upgrades = 0
+    for bit, upgrade in enumerate(game.upgrade_tree.order):
+        if upgrade["id"] in game.upgrades_taken:
+            upgrades |= 1 << bit
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, flags, tick, game.score, game.level,
+                     game.asteroids_for_next_level, upgrades, game.text_progress, game.text_timer,
+                     asteroid_count, len(shots), len(orbs), len(particles))
+    offset = HEADER.size
+    FIELD.pack_into(buffer, offset, field.spawn_timer, field.spawn_rate, field.spawn_rate_decay,
+                    field.min_spawn_rate, field.speed_growth, field.max_asteroids, field.culled, field.wrap)
+    offset += FIELD.size
+    PLAYER.pack_into(buffer, offset, *player.position, *player.previous_position, *player.velocity,
+                     player.angle, player.shot_timer, player.fire_rate_multiplier, player.forcefield_angle,
+                     player.forcefield_hit_cooldown, player.trigger_held, player.dual_shot, player.side_shot,
+                     player.tracking_shots, player.forcefield, player.shot_counter, player.forcefield_hits)
+    offset += PLAYER.size
+    for rng in (game.rng.sim, game.rng.fx):
+        _, words, gauss = rng.getstate()
+        RNG.pack_into(buffer, offset, *words, gauss is not None, gauss or 0.0)
+        offset += RNG.size
+
+    targets = {}  # asteroid -> index, for tracking shots
+    if store is not None:
+        if asteroid_count:
+            rows = np.frombuffer(buffer, ASTEROID_DTYPE, asteroid_count, offset)
+            rows["position"] = store.position[:asteroid_count]
+            rows["previous_position"] = store.previous_position[:asteroid_count]
+            rows["velocity"] = store.velocity[:asteroid_count]
+            rows["radius"] = store.radius[:asteroid_count]
+            rows["rotation"] = store.rotation[:asteroid_count]
+            rows["rotation_speed"] = store.rotation_speed[:asteroid_count]
+            rows["variant"] = np.array(store.shapes.variant)[store.shape_id[:asteroid_count]]
+            del rows  # release the view so the buffer can grow next time
+        offset += asteroid_count * ASTEROID.size
+    else:
+        for index, asteroid in enumerate(asteroids):
+            targets[asteroid] = index
+            ASTEROID.pack_into(buffer, offset, *asteroid.position, *asteroid.previous_position,
+                               *asteroid.velocity, asteroid.radius, asteroid.rotation, asteroid.rotation_speed,
+                               asteroid.shapes.variant[asteroid.shape_id])
+            offset += ASTEROID.size
+
+    for shot in shots:
+        target = -1
+        locked = shot.locked_target() if shot.is_tracking else None
+        if locked is not None:
+            target = locked.index if store is not None else targets[locked]
+        SHOT.pack_into(buffer, offset, shot.is_tracking, *shot.position, *shot.previous_position,
+                       *shot.velocity, shot.angle, target)
+        offset += SHOT.size
+    for orb in orbs:
+        ORB.pack_into(buffer, offset, orb.forcefield_angle, *orb.position, *orb.previous_position)
+        offset += ORB.size
+    for particle in particles.live():
+        PARTICLE.pack_into(buffer, offset, *particle)
+        offset += PARTICLE.size
+    return offset
+
+
+def snapshot(game, tick=0):
+    buffer = bytearray()
+    write(game, buffer, tick)
+    return bytes(buffer)
+
+
+def restore(game, data):
+    # Puts `game` back in the state a snapshot was taken in and returns the
+    # snapshot's tick. The game has to use the same asteroid engine.
+    if len(data) < HEADER.size:
+        raise ValueError("not a snapshot")
+    (magic, version, flags, tick, score, level, next_level, upgrades, text_progress, text_timer,
+     asteroid_count, shot_count, orb_count, particle_count) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} snapshot")
+    if len(data) < size(asteroid_count, shot_count, orb_count, particle_count):
+        raise ValueError("snapshot is truncated")
+    if bool(flags & FLAG_ARRAY_ASTEROIDS) != (game.array_asteroids):
+        raise ValueError("snapshot was taken with the other asteroid engine")
+
+    game.intro_screen = False
+    game.reset_game()
+    world = game.world
+    world.bind()
+    game.score = score
+    game.level = world.level = level
+    game.asteroids_for_next_level = next_level
+    game.upgrades_taken = {upgrade["id"] for bit, upgrade in enumerate(game.upgrade_tree.order)
+                           if upgrades & (1 << bit)}
+    game.game_over = bool(flags & FLAG_GAME_OVER)
+    game.level_up = bool(flags & FLAG_LEVEL_UP)
+    if game.level_up:
+        game.set_upgrade_options()
+    game.text_progress = text_progress
+    game.text_timer = text_timer
+    offset = HEADER.size
+
+    field = game.asteroid_field
+    (field.spawn_timer, field.spawn_rate, field.spawn_rate_decay, field.min_spawn_rate, field.speed_growth,
+     field.max_asteroids, field.culled, wrap) = FIELD.unpack_from(data, offset)
+    field.wrap = bool(wrap)
+    offset += FIELD.size
+
+    player = game.player
+    values = PLAYER.unpack_from(data, offset)
+    player.position.update(values[0:2])
+    player.previous_position.update(values[2:4])
+    player.velocity.update(values[4:6])
+    player.rect.center = player.position
+    (player.angle, player.shot_timer, player.fire_rate_multiplier, player.forcefield_angle,
+     player.forcefield_hit_cooldown, player.trigger_held, player.dual_shot, player.side_shot,
+     player.tracking_shots, player.forcefield, player.shot_counter, player.forcefield_hits) = values[6:]
+    offset += PLAYER.size
+    states = []
+    for _ in range(2):
+        values = RNG.unpack_from(data, offset)
+        states.append((3, values[:625], values[626] if values[625] else None))
+        offset += RNG.size
+
+    # New entities draw from the generators, which are restored last
+    store = game.asteroid_store
+    if store is not None:
+        if asteroid_count:
+            rows = np.frombuffer(data, ASTEROID_DTYPE, asteroid_count, offset)
+            for handle in store.append(rows["position"], rows["velocity"], rows["radius"]):
+                world.add(handle)
+            store.previous_position[:asteroid_count] = rows["previous_position"]
+            store.rotation[:asteroid_count] = rows["rotation"]
+            store.rotation_speed[:asteroid_count] = rows["rotation_speed"]
+            shape = store.shapes.shape
+            store.shape_id[:asteroid_count] = [shape(radius, variant) for radius, variant
+                                               in zip(rows["radius"].tolist(), rows["variant"].tolist())]
+        asteroids = store.handles
+    else:
+        asteroids = []
+        for values in ASTEROID.iter_unpack(data[offset:offset + asteroid_count * ASTEROID.size]):
+            asteroid = Asteroid.create(values[0], values[1], values[6], game.rng)
+            asteroid.previous_position.update(values[2:4])
+            asteroid.velocity.update(values[4:6])
+            asteroid.rotation, asteroid.rotation_speed = values[7:9]
+            asteroid.shape_id = asteroid.shapes.shape(values[6], values[9])
+            asteroids.append(asteroid)
+    offset += asteroid_count * ASTEROID.size
+
+    for _ in range(shot_count):
+        kind, x, y, previous_x, previous_y, velocity_x, velocity_y, angle, target = \
+            SHOT.unpack_from(data, offset)
+        shot = SHOT_KINDS[kind].create(x, y, angle)
+        shot.previous_position.update(previous_x, previous_y)
+        shot.velocity.update(velocity_x, velocity_y)
+        if kind and target >= 0:
+            shot.lock(asteroids[target])
+        world.add(shot)
+        offset += SHOT.size
+    for _ in range(orb_count):
+        angle, x, y, previous_x, previous_y = ORB.unpack_from(data, offset)
+        orb = ForcefieldShot(x, y, angle)
+        orb.previous_position.update(previous_x, previous_y)
+        player.forcefield_shots.append(orb)
+        offset += ORB.size
+    if world.effects:
+        for particle in PARTICLE.iter_unpack(data[offset:offset + particle_count * PARTICLE.size]):
+            world.particles.add(*particle)
+
+    game.rng.sim.setstate(states[0])
+    game.rng.fx.setstate(states[1])
+    return tick
+
+
+def save(game, path, tick=0):
+    # Written next to the file and moved into place, so a crash part way
+    # through never leaves a broken checkpoint behind
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(snapshot(game, tick))
+    os.replace(temporary, path)
+
+
+def load(game, path):
+    with open(path, "rb") as f:
+        return restore(game, f.read())
+
+
+# The last `capacity` snapshots of a game, one per step, the oldest
+# overwritten first. Every slot is a bytearray kept from lap to lap, so once
+# each has grown to the size of a busy field recording allocates nothing.
+class RewindBuffer:
+    def __init__(self, capacity):
+        self.slots = [bytearray() for _ in range(capacity)]
+        self.start = 0  # slot of the oldest snapshot
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.start = self.count = 0
+
+    def record(self, game, tick=0):
+        capacity = len(self.slots)
+        index = (self.start + self.count) % capacity
+        if self.count == capacity:
+            self.start = (self.start + 1) % capacity
+        else:
+            self.count += 1
+        write(game, self.slots[index], tick)
+
+    def rewind(self, game, steps):
+        # Restores the snapshot `steps` records before the newest, or the
+        # oldest kept, and forgets the ones after it. Returns its tick, or
+        # None when nothing has been recorded.
+        if self.count == 0:
+            return None
+        self.count = max(1, self.count - steps)
+        index = (self.start + self.count - 1) % len(self.slots)
+        return restore(game, memoryview(self.slots[index]))
+
+    def memory(self):
+        # Bytes held by the slots
+        return sum(len(slot) for slot in self.slots)
@@ -0,0 +1,136 @@
+import math
+from circleshape import swept_start, time_of_impact
+from constants import ASTEROID_MAX_RADIUS
+
+
+# Uniform grid used as a collision broadphase. Every frame the grid is rebuilt
+# from the sprites' movement over the last step and each collision pass only
+# tests the sprites that share a cell with the query instead of the whole group.
+class SpatialHash:
+    def __init__(self, cell_size=ASTEROID_MAX_RADIUS):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}  # insertion order, so queries match group iteration order
+
+    def __len__(self):
+        return len(self.order)
+
+    def clear(self):
+        self.cells.clear()
+        self.order.clear()
+
+    def _cell_range(self, position, radius):
+        size = self.cell_size
+        return (
+            math.floor((position.x - radius) / size),
+            math.floor((position.y - radius) / size),
+            math.floor((position.x + radius) / size),
+            math.floor((position.y + radius) / size),
+        )
+
+    def _swept_cell_range(self, sprite):
+        # Cells under the box around everything a sprite covered over the
+        # last step
+        start, end = swept_start(sprite), sprite.position
+        x0, x1 = (start.x, end.x) if start.x < end.x else (end.x, start.x)
+        y0, y1 = (start.y, end.y) if start.y < end.y else (end.y, start.y)
+        radius = sprite.radius
+        size = self.cell_size
+        return (
+            math.floor((x0 - radius) / size),
+            math.floor((y0 - radius) / size),
+            math.floor((x1 + radius) / size),
+            math.floor((y1 + radius) / size),
+        )
+
+    def insert(self, sprite):
+        # A sprite is stored in every cell the bounding box of its last step's
+        # movement overlaps, so a query only has to look at the cells covered
+        # by its own
+        if sprite in self.order:
+            return
+        self.order[sprite] = len(self.order)
+        min_x, min_y, max_x, max_y = self._swept_cell_range(sprite)
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    self.cells[(cx, cy)] = [sprite]
+                else:
+                    cell.append(sprite)
+
+    def rebuild(self, sprites):
+        self.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def query(self, position, radius):
+        # Returns every stored sprite whose cells overlap the circle's bounding
+        # box, in insertion order. Candidates still need a precise test.
+        return self._query_cells(*self._cell_range(position, radius))
+
+    def _query_cells(self, min_x, min_y, max_x, max_y):
+        found = set()
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        if len(found) > 1:
+            return sorted(found, key=self.order.__getitem__)
+        return list(found)
+
+    def nearest(self, position, max_distance):
+        # Closest live sprite centre within max_distance, or None. Searches
+        # rings of cells outward from the query and stops once no unsearched
+        # cell can hold anything closer than the best match so far.
+        size = self.cell_size
+        rings = math.ceil(max_distance / size)
+        best = None
+        best_distance = max_distance
+        if (2 * rings + 1) ** 2 > len(self.order):
+            # Sparse grid, checking every sprite is cheaper than the cells
+            for sprite in self.order:
+                distance = position.distance_to(sprite.position)
+                if distance <= best_distance and sprite.alive():
+                    best = sprite
+                    best_distance = distance
+            return best
+
+        cx = math.floor(position.x / size)
+        cy = math.floor(position.y / size)
+        for ring in range(rings + 1):
+            if ring == 0:
+                ring_cells = [(cx, cy)]
+            else:
+                ring_cells = [(x, cy - ring) for x in range(cx - ring, cx + ring + 1)]
+                ring_cells += [(x, cy + ring) for x in range(cx - ring, cx + ring + 1)]
+                ring_cells += [(cx - ring, y) for y in range(cy - ring + 1, cy + ring)]
+                ring_cells += [(cx + ring, y) for y in range(cy - ring + 1, cy + ring)]
+            for key in ring_cells:
+                cell = self.cells.get(key)
+                if not cell:
+                    continue
+                for sprite in cell:
+                    distance = position.distance_to(sprite.position)
+                    if distance <= best_distance and sprite.alive():
+                        best = sprite
+                        best_distance = distance
+            if best is not None and best_distance <= ring * size:
+                break
+        return best
+
+    def impacts(self, sprite):
+        # (time of impact, other) for every stored sprite the sprite touched
+        # during the last step, earliest first
+        candidates = self._query_cells(*self._swept_cell_range(sprite))
+        if not candidates:
+            return candidates
+        hits = []
+        for other in candidates:
+            if other is not sprite:
+                t = time_of_impact(sprite, other)
+                if t is not None:
+                    hits.append((t, other))
+        hits.sort(key=lambda hit: hit[0])
+        return hits
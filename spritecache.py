@@ -0,0 +1,50 @@
+import math
+from collections import OrderedDict
+import pygame
+from constants import ASTEROID_ROTATION_STEP, ASTEROID_SPRITE_CACHE_FRAMES
+
+
+# Pre-rendered asteroid outlines. Each shape from the shape library is
+# rasterized once per quantized rotation and blitted afterwards instead of
+# rebuilding and drawing the polygon every frame. Frames are cached per
+# (shape id, rotation step) and shared by every asteroid with that outline;
+# the least recently used go first when the cache is full.
+class AsteroidSpriteCache:
+    def __init__(self, angle_step=ASTEROID_ROTATION_STEP, max_frames=ASTEROID_SPRITE_CACHE_FRAMES):
+        self.angle_step = angle_step
+        self.steps = max(1, round(360 / angle_step))
+        self.max_frames = max_frames
+        self.frames = OrderedDict()  # (shape id, step) -> (surface, offset)
+        self.hits = 0
+        self.misses = 0
+
+    def frame(self, shape_id, vertices, rotation):
+        # Returns the surface for this shape at the nearest cached rotation
+        # and the offset from the asteroid's position to its top left corner
+        step = round(rotation / self.angle_step) % self.steps
+        key = (shape_id, step)
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.hits += 1
+            self.frames.move_to_end(key)
+            return frame
+        self.misses += 1
+        frame = self._rasterize(vertices, step * self.angle_step)
+        self.frames[key] = frame
+        if len(self.frames) > self.max_frames:
+            self.frames.popitem(last=False)
+        return frame
+
+    def _rasterize(self, vertices, angle):
+        rotated = [pygame.Vector2(vertex[0], vertex[1]).rotate(angle) for vertex in vertices]
+        extent = math.ceil(max(vertex.length() for vertex in rotated)) + 2
+        size = extent * 2
+        surface = pygame.Surface((size, size))
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        center = pygame.Vector2(extent, extent)
+        pygame.draw.polygon(surface, "white", [center + vertex for vertex in rotated], 2)
+        return surface, (-extent, -extent)
+
+    def draw(self, canvas, shape_id, vertices, rotation, x, y):
+        surface, (dx, dy) = self.frame(shape_id, vertices, rotation)
+        canvas.blit(surface, round(x + dx), round(y + dy))
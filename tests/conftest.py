@@ -0,0 +1,22 @@
+import os
+import pytest
+from circleshape import CircleShape
+
+# Nothing is shown while testing; the dummy drivers let pygame run without a
+# display or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@pytest.fixture
+def circle():
+    # Makes a CircleShape at (x, y), optionally coming from `previous` over
+    # the last step and added to `group`
+    def make(x, y, radius=10, previous=None, group=None):
+        shape = CircleShape(x, y, radius)
+        if previous is not None:
+            shape.previous_position.update(previous)
+        if group is not None:
+            group.add(shape)
+        return shape
+    return make
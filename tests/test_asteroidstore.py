@@ -0,0 +1,137 @@
+import pygame
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from asteroidfield import AsteroidField
+from asteroidstore import AsteroidStore, ArrayAsteroid
+from constants import ASTEROID_MIN_RADIUS
+from controls import ScriptedInput, autopilot
+from rng import GameRandom
+from world import World
+
+# (x, y, vx, vy, radius) of asteroids straddling every edge of the play area
+# moving in and out, and a couple well inside it
+ASTEROIDS = [
+    (-200, 300, -50, 0, 40), (-200, 300, 50, 0, 40), (1500, 300, 30, 10, 20),
+    (1500, 300, -30, 10, 20), (600, -200, 5, -40, 60), (600, 1000, 5, 40, 60),
+    (600, 1000, 5, -40, 20), (400, 300, -80, 80, 60), (800, 500, 10, -10, 20),
+]
+
+
+def sprite_world(rng, asteroids=ASTEROIDS):
+    world = World(effects=False)
+    world.bind()
+    field = AsteroidField(world["asteroids"], rng=rng)
+    for x, y, vx, vy, radius in asteroids:
+        field.spawn(radius, pygame.Vector2(x, y), pygame.Vector2(vx, vy))
+    return world, field
+
+
+def array_world(rng, asteroids=ASTEROIDS):
+    world = World(effects=False)
+    store = AsteroidStore(rng)
+    world.use_asteroid_store(store)
+    world.bind()
+    field = AsteroidField(store, asteroid_class=ArrayAsteroid, rng=rng)
+    for x, y, vx, vy, radius in asteroids:
+        field.spawn(radius, pygame.Vector2(x, y), pygame.Vector2(vx, vy))
+    return world, field, store
+
+
+def rows(asteroids):
+    # Sorted (x, y, vx, vy, radius), to compare fields whatever their order
+    return sorted((round(a.position.x, 9), round(a.position.y, 9), round(a.velocity.x, 9),
+                   round(a.velocity.y, 9), a.radius) for a in asteroids)
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_cull_matches_sprite_asteroids(wrap):
+    sprites, sprite_field = sprite_world(GameRandom(1))
+    arrays, array_field, store = array_world(GameRandom(1))
+    sprite_field.wrap = array_field.wrap = wrap
+    sprites.bind()
+    sprite_field.cull()
+    arrays.bind()
+    array_field.cull()
+    assert sprite_field.culled == array_field.culled == (0 if wrap else 4)
+    assert rows(sprites["asteroids"]) == rows(arrays["asteroids"])
+    assert len(arrays["asteroids"]) == store.count
+
+
+def test_split_matches_sprite_asteroids():
+    sprites, _ = sprite_world(GameRandom(2))
+    arrays, _, store = array_world(GameRandom(2))
+    hit = [0, 3, 4, 7]
+    sprites.bind()
+    for asteroid in [list(sprites["asteroids"])[i] for i in hit]:
+        asteroid.split()
+    arrays.bind()
+    store.split(hit)
+    assert rows(sprites["asteroids"]) == rows(arrays["asteroids"])
+    # Two children for every hit asteroid bigger than the smallest kind
+    children = sum(2 for i in hit if ASTEROIDS[i][4] > ASTEROID_MIN_RADIUS)
+    assert len(arrays["asteroids"]) == store.count == len(ASTEROIDS) - len(hit) + children
+    assert [handle.index for handle in store.handles] == list(range(store.count))
+
+
+def test_handles_follow_their_rows():
+    _, _, store = array_world(GameRandom(3))
+    handle = store.handles[-1]
+    x, y, vx, vy, radius = ASTEROIDS[-1]
+    store.compact([0, 2])
+    assert handle.index == store.count - 1
+    assert (handle.position.x, handle.position.y, handle.radius) == (x, y, radius)
+    handle.kill()
+    assert handle.index == -1
+    assert store.count == len(ASTEROIDS) - 3
+    assert not handle.alive()
+
+
+@pytest.mark.parametrize("seed", [1, 5])
+def test_engines_play_the_same_game(seed):
+    from main import Game
+    games = [Game(array_asteroids=array, headless=True, seed=seed, input_source=ScriptedInput(autopilot))
+             for array in (False, True)]
+    for game in games:
+        game.start_game()
+    for tick in range(1500):
+        for game in games:
+            game.step(game.step_dt)
+        if tick % 100 == 0:
+            assert rows(games[0].asteroids) == rows(games[1].asteroids)
+    assert games[0].score == games[1].score > 0
+    assert games[0].game_over == games[1].game_over
+    for game in games:
+        game.world.clear()
+
+
+def test_nearest_matches_the_sprite_grid():
+    from spatialhash import SpatialHash
+    sprites, _ = sprite_world(GameRandom(4))
+    _, _, store = array_world(GameRandom(4))
+    grid = SpatialHash()
+    grid.rebuild(sprites["asteroids"])
+    for x, y, max_distance in [(0, 0, 1000), (600, 900, 150), (700, 400, 50), (-150, 320, 100)]:
+        position = pygame.Vector2(x, y)
+        expected = grid.nearest(position, max_distance)
+        found = store.nearest(position, max_distance)
+        if expected is None:
+            assert found is None
+        else:
+            assert found.position == expected.position
+
+
+def test_impacts_match_the_sprite_grid(circle):
+    from spatialhash import SpatialHash
+    sprites, _ = sprite_world(GameRandom(5))
+    _, _, store = array_world(GameRandom(5))
+    grid = SpatialHash()
+    grid.rebuild(sprites["asteroids"])
+    # A fast mover sweeping through the middle of the field
+    mover = circle(430, 320, radius=15, previous=(350, 290))
+    expected = [(t, other.position) for t, other in grid.impacts(mover)]
+    found = [(t, other.position) for t, other in store.impacts(mover)]
+    assert expected
+    assert [position for _, position in found] == [position for _, position in expected]
+    assert [t for t, _ in found] == pytest.approx([t for t, _ in expected])
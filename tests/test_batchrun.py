@@ -0,0 +1,31 @@
+from batchrun import FIELDS, Report
+
+
+def session(ticks, game_over):
+    values = {"seed": 0, "level": 1, "score": 0, "ticks": ticks, "game_over": game_over,
+              "peak_asteroids": 0, "peak_shots": 0, "ticks_per_sec": 1000.0}
+    return tuple(values[name] for name in FIELDS)
+
+
+def test_an_empty_report_prints(capsys):
+    Report().print(1.0, 60)
+    assert "no sessions played" in capsys.readouterr().out
+
+
+def test_survival_only_counts_games_that_ended(capsys):
+    report = Report()
+    for ticks in (600, 1200, 1800):
+        report.add(session(ticks, True))
+    for _ in range(5):
+        report.add(session(18000, False))  # still alive at the tick limit
+    report.print(1.0, 60)
+    out = capsys.readouterr().out
+    assert "game over in 3 of 8" in out
+    assert "median survival 20.0s over the 3 games that ended" in out
+
+
+def test_survival_without_finished_games(capsys):
+    report = Report()
+    report.add(session(18000, False))
+    report.print(1.0, 60)
+    assert "median survival unknown" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+import pygame
+from canvas import Canvas
+
+BACKGROUND = (200, 0, 0)
+
+
+def screen():
+    surface = pygame.Surface((100, 100))
+    surface.fill(BACKGROUND)
+    return surface
+
+
+def test_faded_lines_blend_over_the_background():
+    surface = screen()
+    canvas = Canvas(surface)
+    canvas.fade_lines([(10, 50), (90, 50)], 128)
+    rects = canvas.finish()
+    assert any(rect.collidepoint(50, 50) for rect in rects)
+    red, green, blue, _ = surface.get_at((50, 50))
+    # Half way between the background and white, not an opaque grey
+    assert red > 200
+    assert 120 <= green <= 135 and 120 <= blue <= 135
+    assert surface.get_at((50, 20)) == BACKGROUND
+
+
+def test_fully_faded_lines_leave_the_background():
+    surface = screen()
+    canvas = Canvas(surface)
+    canvas.fade_lines([(10, 50), (90, 50)], 0)
+    canvas.finish()
+    assert surface.get_at((50, 50)) == BACKGROUND
+
+
+def test_the_layer_is_cleared_after_each_frame():
+    surface = screen()
+    canvas = Canvas(surface)
+    canvas.fade_lines([(10, 50), (90, 50)], 255)
+    canvas.fade_lines([(50, 10), (50, 90)], 255)  # overlapping lines are blended once
+    canvas.finish()
+    assert surface.get_at((50, 50)) == (255, 255, 255)
+    surface.fill(BACKGROUND)
+    assert canvas.finish() == []
+    assert surface.get_at((50, 50)) == BACKGROUND
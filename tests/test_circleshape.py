@@ -0,0 +1,44 @@
+import pytest
+from circleshape import time_of_impact
+
+
+def test_head_on_impact_time(circle):
+    # 30 apart with radii of 5, closing by 80 over the step: touching once
+    # 20 of it has closed
+    a = circle(40, 0, radius=5, previous=(0, 0))
+    b = circle(-10, 0, radius=5, previous=(30, 0))
+    assert time_of_impact(a, b) == pytest.approx(0.25)
+    assert time_of_impact(b, a) == pytest.approx(0.25)
+
+
+def test_fast_shot_passing_through_is_caught(circle):
+    # The end positions are far apart; only the sweep sees the hit
+    shot = circle(90, 0, radius=2, previous=(0, 0))
+    asteroid = circle(45, 3)
+    assert not shot.collision(asteroid)
+    # Touching 12 apart, 3 of it across the line of travel
+    assert time_of_impact(shot, asteroid) == pytest.approx((45 - (12 ** 2 - 3 ** 2) ** 0.5) / 90)
+
+
+def test_touching_at_the_start_is_time_zero(circle):
+    assert time_of_impact(circle(0, 0, radius=5), circle(50, 0, radius=5, previous=(8, 0))) == 0.0
+
+
+@pytest.mark.parametrize("a, b", [
+    (((0, 0), (10, 0)), ((50, 0), (60, 0))),  # same movement, never closer
+    (((0, 0), (-10, 0)), ((30, 0), (40, 0))),  # moving apart
+    (((0, 0), (90, 0)), ((45, 30), (45, 30))),  # passing by
+    (((0, 0), (20, 0)), ((60, 0), (60, 0))),  # would touch, but not within the step
+])
+def test_misses(circle, a, b):
+    # (start, end) of each shape over the step
+    (a_start, a_end), (b_start, b_end) = a, b
+    assert time_of_impact(circle(*a_end, radius=5, previous=a_start),
+                          circle(*b_end, radius=5, previous=b_start)) is None
+
+
+def test_jumps_are_not_swept(circle):
+    # A screen wrap isn't a path the shape travelled
+    wrapped = circle(-20, 0, radius=5, previous=(1300, 0))
+    asteroid = circle(600, 0, radius=5)
+    assert time_of_impact(wrapped, asteroid) is None
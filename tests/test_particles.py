@@ -0,0 +1,35 @@
+import pytest
+from constants import PARTICLE_CAPACITY, EXPLOSION_LIFETIME
+from particles import Particles
+from rng import GameRandom
+
+
+def test_a_full_ring_overwrites_the_oldest():
+    particles = Particles()
+    for n in range(PARTICLE_CAPACITY + 10):
+        particles.add(n, 0, 1, 1)
+    assert len(particles) == PARTICLE_CAPACITY
+    xs = [x for x, *_ in particles.live()]
+    assert xs == list(range(10, PARTICLE_CAPACITY + 10))
+
+
+def test_particles_expire_after_the_explosion_lifetime():
+    particles = Particles()
+    particles.add(0, 0, 1, 1)
+    particles.update(EXPLOSION_LIFETIME / 2)
+    particles.add(1, 0, 1, 1)
+    particles.update(EXPLOSION_LIFETIME / 2 - 0.01)
+    assert len(particles) == 2
+    particles.update(0.02)
+    assert [x for x, *_ in particles.live()] == [1]
+    particles.update(EXPLOSION_LIFETIME / 2)
+    assert len(particles) == 0
+
+
+def test_late_explosions_start_part_way_through_their_life():
+    particles = Particles()
+    particles.emit(100, 100, 20, GameRandom(1), age=EXPLOSION_LIFETIME - 0.01)
+    assert 8 <= len(particles) <= 12
+    assert all(age == pytest.approx(EXPLOSION_LIFETIME - 0.01) for *_, age in particles.live())
+    particles.update(0.02)
+    assert len(particles) == 0
@@ -0,0 +1,49 @@
+import pytest
+from controls import InputState
+from player import Player
+
+COOLDOWN = 0.0625  # fire rate 0.5s at 8x, exact in binary
+
+
+def armed_player(**upgrades):
+    player = Player(400, 300)
+    player.fire_rate_multiplier = player.fire_rate / COOLDOWN
+    for name, value in upgrades.items():
+        setattr(player, name, value)
+    return player
+
+
+def hold_trigger(player, dt):
+    player.controls = InputState(shoot=True)
+    player.update(dt)
+    return player.shoot()
+
+
+def test_a_fresh_press_fires_one_volley():
+    player = armed_player()
+    player.shot_timer = 10  # idle for a long time
+    assert len(player.shoot()) == 1
+
+
+def test_every_volley_due_in_a_step_is_fired():
+    player = armed_player(dual_shot=True, side_shot=True)
+    assert len(player.shoot()) == 4
+    assert len(hold_trigger(player, 4 * COOLDOWN)) == 4 * 4
+    assert len(hold_trigger(player, COOLDOWN / 2)) == 0
+    assert len(hold_trigger(player, COOLDOWN / 2)) == 4
+
+
+def test_late_volleys_are_moved_along_by_their_age():
+    player = armed_player()
+    player.shoot()
+    shots = hold_trigger(player, 4 * COOLDOWN)
+    # The oldest volley came due first and has flown the furthest
+    ages = [3 * COOLDOWN, 2 * COOLDOWN, COOLDOWN, 0]
+    for shot, age in zip(shots, ages):
+        expected = player.position + shot.velocity * age
+        assert shot.position.x == pytest.approx(expected.x)
+        assert shot.position.y == pytest.approx(expected.y)
+        assert shot.previous_position == shot.position
+    # So consecutive shots are evenly spaced along the line of fire
+    gaps = [shots[i].position.distance_to(shots[i + 1].position) for i in range(3)]
+    assert gaps == pytest.approx([shots[0].velocity.length() * COOLDOWN] * 3)
@@ -0,0 +1,103 @@
+import pygame
+from pool import Pool, Pooled
+
+
+class Thing(Pooled, pygame.sprite.Sprite):
+    pool = None
+
+    def __init__(self, value):
+        super().__init__()
+        self.reset(value)
+
+    def reset(self, value):
+        self.value = value
+
+
+def test_killed_objects_are_reused_after_a_flush():
+    pool = Thing.pool = Pool(Thing)
+    try:
+        group = pygame.sprite.Group()
+        first = Thing.create(1)
+        group.add(first)
+        first.kill()
+        # Not handed out again within the step it was killed in
+        assert Thing.create(2) is not first
+        pool.flush()
+        again = Thing.create(3)
+        assert again is first
+        assert again.value == 3
+        assert pool.stats() == {"created": 2, "reused": 1, "live": 2, "free": 0, "high_water": 2}
+    finally:
+        Thing.pool = None
+
+
+def test_releasing_twice_is_harmless():
+    pool = Thing.pool = Pool(Thing)
+    try:
+        thing = Thing.create(1)
+        thing.kill()
+        thing.kill()
+        pool.flush()
+        assert pool.stats()["live"] == 0
+        assert pool.stats()["free"] == 1
+        assert Thing.create(2) is thing
+        assert Thing.create(3) is not thing
+    finally:
+        Thing.pool = None
+
+
+def test_objects_made_outside_a_pool_are_not_kept():
+    pool = Pool(Thing)
+    thing = Thing(1)  # made directly, not through create()
+    pool.release(thing)
+    assert pool.stats()["free"] == 0
+    assert Thing.create(2) is not thing  # no pool set, plain construction
+
+
+def test_game_recycles_shots_and_asteroids():
+    from controls import ScriptedInput, autopilot
+    from main import Game
+    game = Game(headless=True, seed=1, input_source=ScriptedInput(autopilot))
+    game.run_headless(1500)
+    shots, asteroids = game.pools["shot"].stats(), game.pools["asteroid"].stats()
+    assert shots["reused"] > shots["created"]
+    assert asteroids["reused"] > 0
+    assert shots["live"] == len(game.shots)
+    assert asteroids["live"] == len(game.asteroids)
+    game.world.clear()
+    assert game.pools["shot"].stats()["live"] == game.pools["asteroid"].stats()["live"] == 0
+
+
+class Nearest:
+    # Nearest asteroid index that always finds the same asteroid
+    def __init__(self, found):
+        self.found = found
+
+    def nearest(self, position, radius):
+        return self.found
+
+
+def test_tracking_shot_drops_a_lock_on_a_recycled_asteroid():
+    from asteroid import Asteroid
+    from controls import ScriptedInput, autopilot
+    from main import Game
+    from shot import TrackingShot
+    game = Game(headless=True, seed=1, input_source=ScriptedInput(autopilot))
+    game.world.clear()
+    game.pools["asteroid"].flush()
+    locked = Asteroid.create(300, 300, 40)
+    shot = TrackingShot.create(300, 400, 0)
+    shot.steer(game.step_dt, Nearest(locked))
+    assert shot.locked_target() is locked
+
+    locked.kill()
+    game.pools["asteroid"].flush()
+    # Handed out again as an unrelated asteroid, alive in the same group
+    recycled = Asteroid.create(100, 100, 40)
+    assert recycled is locked and recycled.alive()
+    assert shot.locked_target() is None
+
+    other = Asteroid.create(350, 300, 40)
+    shot.steer(game.step_dt, Nearest(other))
+    assert shot.target is other
+    assert shot.locked_target() is other
@@ -0,0 +1,57 @@
+import csv
+import json
+from profiler import Profiler
+
+
+def frames(profiler, count):
+    for frame in range(count):
+        with profiler.scope("update"):
+            pass
+        if frame % 2:
+            profiler.add("shoot", 0.001)
+        profiler.end_frame({"asteroids": frame})
+
+
+def test_csv_is_streamed_with_declared_columns(tmp_path):
+    path = tmp_path / "frames.csv"
+    profiler = Profiler(export=str(path))
+    profiler.declare(["update", "shoot"], ["asteroids"])
+    frames(profiler, 5)
+    profiler.file.flush()
+    # Written as they are taken, before close
+    rows = list(csv.DictReader(path.open()))
+    assert len(rows) == 5
+    profiler.close()
+    rows = list(csv.DictReader(path.open()))
+    assert list(rows[0]) == ["frame", "frame_ms", "gc_ms", "gc_collections", "update_ms", "shoot_ms", "asteroids"]
+    assert rows[0]["shoot_ms"] == ""
+    assert float(rows[1]["shoot_ms"]) == 1.0
+    assert [row["asteroids"] for row in rows] == ["0", "1", "2", "3", "4"]
+
+
+def test_undeclared_csv_columns_are_dropped_with_a_warning(tmp_path, capsys):
+    path = tmp_path / "frames.csv"
+    profiler = Profiler(export=str(path))
+    frames(profiler, 4)  # shoot first shows up on the second frame
+    profiler.close()
+    assert capsys.readouterr().out.count("shoot_ms") == 1
+    rows = list(csv.DictReader(path.open()))
+    assert len(rows) == 4
+    assert "shoot_ms" not in rows[0]
+
+
+def test_json_lines_keep_every_key(tmp_path):
+    path = tmp_path / "frames.jsonl"
+    profiler = Profiler(export=str(path))
+    frames(profiler, 2)
+    profiler.close()
+    samples = [json.loads(line) for line in path.open()]
+    assert [sample["frame"] for sample in samples] == [0, 1]
+    assert "shoot_ms" in samples[1]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    frames(profiler, 3)
+    assert profiler.frame == 0
+    assert not profiler.samples
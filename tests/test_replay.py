@@ -0,0 +1,60 @@
+import pytest
+from constants import SIMULATION_TICK_RATE
+from controls import InputState, ScriptedInput, autopilot
+from main import Game
+from replay import Replay, InputRecorder, ReplayInput, encode, decode
+
+FIELDS = ("thrust", "reverse", "left", "right", "shoot", "upgrade")
+
+
+def fields(state):
+    return tuple(getattr(state, name) for name in FIELDS)
+
+
+def test_every_input_byte_round_trips():
+    for code in range(256):
+        assert encode(decode(code)) == code
+
+
+def test_input_round_trips():
+    state = InputState(thrust=True, left=True, shoot=True, upgrade="2")
+    assert fields(decode(encode(state))) == fields(state)
+    # Keys that aren't upgrade choices aren't recorded
+    assert decode(encode(InputState(upgrade="q"))).upgrade is None
+
+
+def test_file_round_trip(tmp_path):
+    # Long runs of one input are split at the largest run the format holds
+    codes = bytearray([0] * 70000 + [17, 17, 3] + [64] * 5)
+    replay = Replay(2 ** 62, 120, array_asteroids=True, codes=codes)
+    path = str(tmp_path / "game.replay")
+    replay.save(path)
+    loaded = Replay.load(path)
+    assert (loaded.seed, loaded.tick_rate, loaded.array_asteroids) == (2 ** 62, 120, True)
+    assert loaded.codes == codes
+
+
+def test_truncated_file_is_refused(tmp_path):
+    path = tmp_path / "game.replay"
+    Replay(1, 60, codes=bytearray([1, 2, 3])).save(str(path))
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError, match="truncated"):
+        Replay.load(str(path))
+
+
+def test_replay_plays_the_recorded_game(tmp_path):
+    recording = Replay(5, SIMULATION_TICK_RATE)
+    game = Game(headless=True, seed=5, input_source=InputRecorder(ScriptedInput(autopilot), recording))
+    ticks = game.run_headless(6000)
+    score = game.score
+    game.world.clear()
+    path = str(tmp_path / "game.replay")
+    recording.save(path)
+
+    replay = Replay.load(path)
+    game = Game(headless=True, seed=replay.seed, tick_rate=replay.tick_rate,
+                input_source=ReplayInput(replay))
+    assert game.run_headless(len(replay)) == ticks == len(replay)
+    assert game.game_over
+    assert game.score == score > 0
+    game.world.clear()
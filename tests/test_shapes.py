@@ -0,0 +1,42 @@
+from asteroid import Asteroid
+from constants import ASTEROID_MIN_RADIUS, ASTEROID_KINDS, ASTEROID_SHAPE_VARIANTS, ASTEROID_SHAPE_SEED
+from shapes import ShapeLibrary, default_library
+
+RADII = [ASTEROID_MIN_RADIUS * kind for kind in range(1, ASTEROID_KINDS + 1)]
+
+
+def test_every_asteroid_kind_has_its_variants_up_front():
+    library = ShapeLibrary()
+    assert sorted(library.by_radius) == RADII
+    for radius in RADII:
+        ids = library.shape_ids(radius)
+        assert len(ids) == ASTEROID_SHAPE_VARIANTS
+        assert [library.variant[i] for i in ids] == list(range(ASTEROID_SHAPE_VARIANTS))
+        assert len(set(library.shapes[i] for i in ids)) == ASTEROID_SHAPE_VARIANTS
+    assert len(library.shapes) == ASTEROID_KINDS * ASTEROID_SHAPE_VARIANTS
+
+
+def test_the_same_radius_and_variant_share_one_outline():
+    library = ShapeLibrary()
+    for radius in RADII + [37]:
+        for variant in range(ASTEROID_SHAPE_VARIANTS):
+            shape_id = library.shape(radius, variant)
+            assert library.shape(radius, variant) == shape_id
+            assert library.variant[shape_id] == variant
+    assert len(library.shapes) == (ASTEROID_KINDS + 1) * ASTEROID_SHAPE_VARIANTS
+
+    first = Asteroid(100, 100, RADII[0])
+    second = Asteroid(200, 200, RADII[0])
+    second.shape_id = first.shape_id
+    assert second.vertices is first.vertices is default_library.shapes[first.shape_id]
+
+
+def test_outlines_only_depend_on_the_seed():
+    library = ShapeLibrary()
+    other = ShapeLibrary(seed=ASTEROID_SHAPE_SEED)
+    other.shape_ids(37)  # built in a different order
+    for radius in RADII + [37]:
+        for variant in range(ASTEROID_SHAPE_VARIANTS):
+            assert library.shapes[library.shape(radius, variant)] == other.shapes[other.shape(radius, variant)]
+    reseeded = ShapeLibrary(seed=ASTEROID_SHAPE_SEED + 1)
+    assert reseeded.shapes[reseeded.shape(RADII[0], 0)] != library.shapes[library.shape(RADII[0], 0)]
@@ -0,0 +1,97 @@
+import pytest
+import snapshot
+from controls import ScriptedInput, autopilot
+from main import Game
+from snapshot import RewindBuffer
+
+ENGINES = [False, pytest.param(True, id="array")]
+
+
+def new_game(array_asteroids, seed=3, upgrades=()):
+    if array_asteroids:
+        pytest.importorskip("numpy")
+    game = Game(array_asteroids=array_asteroids, headless=True, seed=seed, effects=True,
+                input_source=ScriptedInput(autopilot))
+    game.start_game()
+    for upgrade in upgrades:
+        game.upgrade_tree.apply(upgrade, game.player)
+        game.upgrades_taken.add(upgrade)
+    return game
+
+
+def run(game, ticks):
+    for _ in range(ticks):
+        game.step(game.step_dt)
+
+
+@pytest.mark.parametrize("array_asteroids", ENGINES)
+@pytest.mark.parametrize("upgrades", [(), ("dual_shot", "side_shot", "tracking_shots", "forcefield")],
+                         ids=["plain", "upgraded"])
+def test_restored_game_carries_on_identically(array_asteroids, upgrades):
+    original = new_game(array_asteroids, upgrades=upgrades)
+    run(original, 600)
+    for _ in range(600):  # on to a step with an explosion going off
+        if len(original.world.particles):
+            break
+        run(original, 1)
+    particles = len(original.world.particles)
+    assert particles
+    middle = snapshot.snapshot(original, tick=600)
+    script_tick = original.input.tick  # the autopilot is a function of it
+    assert snapshot.snapshot(original, tick=600) == middle  # snapshots don't disturb the game
+    run(original, 600)
+    end = snapshot.snapshot(original)
+    original.world.clear()
+
+    # Restored into a game that was somewhere else entirely
+    copy = new_game(array_asteroids, seed=99)
+    run(copy, 50)
+    assert snapshot.restore(copy, middle) == 600
+    assert len(copy.world.particles) == particles
+    assert snapshot.snapshot(copy, tick=600) == middle
+    copy.input.tick = script_tick
+    run(copy, 600)
+    assert snapshot.snapshot(copy) == end
+    copy.world.clear()
+
+
+def test_file_round_trip(tmp_path):
+    game = new_game(False)
+    run(game, 300)
+    path = str(tmp_path / "game.snap")
+    snapshot.save(game, path, tick=300)
+    data = snapshot.snapshot(game, tick=300)
+    assert snapshot.load(game, path) == 300
+    assert snapshot.snapshot(game, tick=300) == data
+    game.world.clear()
+
+
+def test_bad_snapshots_are_refused():
+    game = new_game(False)
+    data = snapshot.snapshot(game)
+    with pytest.raises(ValueError, match="truncated"):
+        snapshot.restore(game, data[:-1])
+    with pytest.raises(ValueError, match="version"):
+        snapshot.restore(game, b"XXXX" + data[4:])
+    game.world.clear()
+
+
+def test_rewind_buffer_keeps_the_newest_snapshots():
+    game = new_game(False)
+    buffer = RewindBuffer(5)
+    ticks = {}
+    for tick in range(12):
+        run(game, 10)
+        buffer.record(game, tick)
+        ticks[tick] = snapshot.snapshot(game, tick)
+    assert len(buffer) == 5
+    # Ticks 7 to 11 are kept, after wrapping around the slots twice
+    assert buffer.rewind(game, 2) == 9
+    assert snapshot.snapshot(game, 9) == ticks[9]
+    assert len(buffer) == 3
+    assert buffer.rewind(game, 100) == 7  # no further back than the oldest
+    assert snapshot.snapshot(game, 7) == ticks[7]
+    assert len(buffer) == 1
+    buffer.clear()
+    assert buffer.rewind(game, 1) is None
+    game.world.clear()
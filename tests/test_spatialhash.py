@@ -0,0 +1,83 @@
+import random
+import pygame
+from spatialhash import SpatialHash
+
+
+def test_query_finds_sprites_in_overlapping_cells(circle):
+    grid = SpatialHash(cell_size=50)
+    near = circle(10, 10)
+    far = circle(500, 500)
+    grid.rebuild([near, far])
+    assert grid.query(pygame.Vector2(30, 30), 5) == [near]
+    assert grid.query(pygame.Vector2(300, 300), 5) == []
+
+
+def test_query_keeps_insertion_order(circle):
+    grid = SpatialHash(cell_size=50)
+    shapes = [circle(x, 20, radius=30) for x in (90, 10, 50)]
+    grid.rebuild(shapes)
+    assert grid.query(pygame.Vector2(50, 20), 40) == shapes
+
+
+def test_sprite_is_stored_along_its_last_step(circle):
+    # A fast sprite is found anywhere along the path it took
+    grid = SpatialHash(cell_size=20)
+    bullet = circle(90, 10, radius=2, previous=(0, 10))
+    grid.insert(bullet)
+    grid.insert(bullet)  # inserting twice is harmless
+    assert len(grid) == 1
+    assert grid.query(pygame.Vector2(45, 10), 5) == [bullet]
+
+
+def test_jumps_only_count_their_new_position(circle):
+    # Screen wraps move a sprite across the screen in one step
+    grid = SpatialHash(cell_size=20)
+    wrapped = circle(1000, 10, radius=2, previous=(0, 10))
+    grid.insert(wrapped)
+    assert grid.query(pygame.Vector2(500, 10), 5) == []
+    assert grid.query(pygame.Vector2(1000, 10), 5) == [wrapped]
+
+
+def test_rebuild_forgets_old_sprites(circle):
+    grid = SpatialHash(cell_size=50)
+    grid.rebuild([circle(10, 10)])
+    grid.rebuild([])
+    assert len(grid) == 0
+    assert grid.query(pygame.Vector2(10, 10), 10) == []
+
+
+def test_nearest_finds_the_closest_live_sprite(circle):
+    group = pygame.sprite.Group()
+    grid = SpatialHash(cell_size=50)
+    closest = circle(130, 100, group=group)
+    grid.rebuild([circle(400, 100, group=group), closest, circle(100, 300, group=group)])
+    assert grid.nearest(pygame.Vector2(100, 100), 500) is closest
+    closest.kill()
+    assert grid.nearest(pygame.Vector2(100, 100), 500).position == (100, 300)
+    assert grid.nearest(pygame.Vector2(100, 100), 150) is None
+
+
+def test_nearest_agrees_with_a_brute_force_search(circle):
+    # Enough sprites that the ring search is used rather than a scan
+    rng = random.Random(1)
+    group = pygame.sprite.Group()
+    shapes = [circle(rng.uniform(0, 1280), rng.uniform(0, 720), group=group) for _ in range(400)]
+    grid = SpatialHash(cell_size=60)
+    grid.rebuild(shapes)
+    for _ in range(100):
+        position = pygame.Vector2(rng.uniform(0, 1280), rng.uniform(0, 720))
+        max_distance = rng.uniform(10, 300)
+        in_range = [shape for shape in shapes if position.distance_to(shape.position) <= max_distance]
+        expected = min(in_range, key=lambda shape: position.distance_to(shape.position), default=None)
+        assert grid.nearest(position, max_distance) is expected
+
+
+def test_impacts_are_earliest_first(circle):
+    grid = SpatialHash(cell_size=50)
+    shot = circle(95, 0, radius=2, previous=(0, 0))
+    far = circle(80, 0)
+    near = circle(30, 0)
+    grid.rebuild([far, shot, near, circle(50, 40)])
+    assert [other for _, other in grid.impacts(shot)] == [near, far]
+    times = [t for t, _ in grid.impacts(shot)]
+    assert times == sorted(times) and 0 < times[0] < 1
@@ -0,0 +1,41 @@
+import pygame
+import pytest
+from textcache import TextCache
+
+
+@pytest.fixture(scope="module")
+def font():
+    pygame.font.init()
+    return pygame.font.Font(None, 16)
+
+
+def test_repeated_text_is_rendered_once(font):
+    cache = TextCache()
+    first = cache.render(font, "SCORE")
+    assert cache.render(font, "SCORE") is first
+    assert cache.render(font, "SCORE", "yellow") is not first
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_least_recently_used_text_is_evicted(font):
+    cache = TextCache(max_size=2)
+    a = cache.render(font, "a")
+    cache.render(font, "b")
+    cache.render(font, "a")  # b is now the least recently used
+    cache.render(font, "c")
+    assert cache.render(font, "a") is a
+    assert cache.stats()["size"] == 2
+    misses = cache.misses
+    cache.render(font, "b")
+    assert cache.misses == misses + 1
+
+
+def test_counter_is_drawn_from_digit_glyphs(font):
+    cache = TextCache()
+    screen = pygame.Surface((200, 50))
+    first = cache.draw_counter(screen, font, "SCORE: ", 120, topright=(200, 0))
+    second = cache.draw_counter(screen, font, "SCORE: ", 987, topright=(200, 0))
+    assert first.topright == second.topright == (200, 0)
+    # The label and the digit glyphs are rendered once, not one string per score
+    assert cache.misses == 2
+    assert cache.stats()["size"] == 1
@@ -0,0 +1,92 @@
+import json
+import pytest
+from player import Player
+from upgrades import UpgradeTree, UPGRADES_PATH, validate
+
+# What the hand written cascade in Game.set_upgrade_options offered before
+# the upgrade tree, as (level, upgrades taken) -> names in key order, for
+# every state a game could reach at levels 2 to 4
+CASCADE = {
+    (2, ()): ["Rapid Fire", "Dual Shot"],
+    (3, ("dual_shot",)): ["Rapid Fire", "Side Shots"],
+    (3, ("rapid_fire",)): ["Dual Shot", "Super Rapid Fire"],
+    (4, ("dual_shot", "side_shot")): ["Rapid Fire", "Tracking Shots"],
+    (4, ("dual_shot", "rapid_fire")): ["Side Shots", "Super Rapid Fire"],
+    (4, ("rapid_fire", "super_rapid_fire")): ["Dual Shot", "Ultra Rapid Fire"],
+}
+
+
+def load_upgrades():
+    with open(UPGRADES_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def tree():
+    return UpgradeTree.load()
+
+
+@pytest.mark.parametrize("level, taken", CASCADE)
+def test_early_offers_match_the_cascade(tree, level, taken):
+    options = tree.offers(level, set(taken))
+    assert [option["name"] for option in options] == CASCADE[level, taken]
+    assert [option["key"] for option in options] == ["1", "2"]
+
+
+def test_cascade_covers_every_early_state(tree):
+    early = {(level, tuple(sorted(taken))) for level, taken in tree.offer_table if level <= 4}
+    assert early == set(CASCADE)
+
+
+def test_offers_past_the_last_level_share_its_entry(tree):
+    taken = {"rapid_fire", "super_rapid_fire", "ultra_rapid_fire"}
+    assert tree.offers(9, taken) == tree.offers(tree.last_level, taken)
+
+
+def test_offers_outside_the_tree_are_worked_out(tree):
+    # e.g. a benchmark handing out upgrades directly
+    options = tree.offers(5, {"tracking_shots"})
+    assert [option["id"] for option in options] == ["rapid_fire", "dual_shot"]
+
+
+def test_apply_sets_and_multiplies_player_fields(tree):
+    player = Player(0, 0)
+    rate = player.fire_rate_multiplier
+    tree.apply("rapid_fire", player)
+    tree.apply("super_rapid_fire", player)
+    tree.apply("dual_shot", player)
+    assert player.fire_rate_multiplier == rate * 4
+    assert player.dual_shot
+
+
+def test_shipped_tree_is_valid():
+    assert validate(load_upgrades()) == []
+
+
+@pytest.mark.parametrize("change, problem", [
+    (lambda upgrades: upgrades[1].update(id="rapid_fire"), "rapid_fire: duplicate id"),
+    (lambda upgrades: upgrades[0].update(requires=["nope"]), "rapid_fire: requires unknown upgrade 'nope'"),
+    (lambda upgrades: upgrades[0].update(excludes=["rapid_fire"]), "rapid_fire: excludes itself"),
+    (lambda upgrades: upgrades[0].update(level=1), "rapid_fire: level must be a whole number of at least 2"),
+    (lambda upgrades: upgrades[0].update(colour="red"), "rapid_fire: unknown key 'colour'"),
+    (lambda upgrades: upgrades[0].update(multiply={"dual_shot": 2}), "rapid_fire: can't multiply dual_shot by 2"),
+    (lambda upgrades: upgrades[1].update(set={"speed": 2}), "dual_shot: set unknown player field 'speed'"),
+    (lambda upgrades: upgrades[1].pop("set"), "dual_shot: has no effect"),
+])
+def test_validate_reports_problems(change, problem):
+    upgrades = load_upgrades()
+    change(upgrades)
+    assert problem in validate(upgrades)
+
+
+def test_validate_finds_unreachable_upgrades():
+    upgrades = load_upgrades()
+    upgrades[0]["requires"] = ["mega_rapid_fire"]
+    assert "rapid_fire: can never be offered" in validate(upgrades)
+
+
+def test_invalid_tree_is_refused():
+    upgrades = load_upgrades()
+    upgrades[0]["level"] = 0
+    with pytest.raises(ValueError, match="invalid upgrade tree"):
+        UpgradeTree(upgrades)
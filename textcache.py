@@ -0,0 +1,63 @@
+from collections import OrderedDict
+import pygame
+from constants import TEXT_CACHE_SIZE
+
+
+# Cache of rendered text surfaces. Menu and HUD text is mostly the same from
+# one frame to the next, so it is rasterized once and blitted afterwards.
+# Numbers that change often (score, level) are drawn from per-digit glyphs
+# instead, so a new score never needs a whole string rendered.
+class TextCache:
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()  # least recently used first
+        self.glyphs = {}  # (font, color) -> surfaces for "0" to "9"
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color="white"):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def digits(self, font, color="white"):
+        key = (font, color)
+        glyphs = self.glyphs.get(key)
+        if glyphs is None:
+            self.misses += 1
+            glyphs = [font.render(str(digit), True, color) for digit in range(10)]
+            self.glyphs[key] = glyphs
+        else:
+            self.hits += 1
+        return glyphs
+
+    def draw_counter(self, screen, font, label, value, color="white", **anchor):
+        # Draws label followed by value, positioned like Surface.get_rect,
+        # e.g. draw_counter(screen, font, "SCORE: ", 12, topright=(x, y))
+        label_surface = self.render(font, label, color)
+        glyphs = self.digits(font, color)
+        number = [glyphs[int(digit)] for digit in str(value)]
+        width = label_surface.get_width() + sum(glyph.get_width() for glyph in number)
+        height = max([label_surface.get_height()] + [glyph.get_height() for glyph in number])
+        rect = pygame.Rect(0, 0, width, height)
+        for name, position in anchor.items():
+            setattr(rect, name, position)
+
+        screen.blit(label_surface, rect.topleft)
+        x = rect.left + label_surface.get_width()
+        for glyph in number:
+            screen.blit(glyph, (x, rect.top))
+            x += glyph.get_width()
+        return rect
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces)}
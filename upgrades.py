@@ -0,0 +1,187 @@
+import json
+import os
+import sys
+from collections import deque
+from constants import UPGRADE_OFFERS
+
+UPGRADES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "upgrades.json")
+
+# Player fields an upgrade may change
+PLAYER_FIELDS = {
+    "fire_rate_multiplier": (int, float),
+    "dual_shot": bool,
+    "side_shot": bool,
+    "tracking_shots": bool,
+    "forcefield": bool,
+}
+KEYS = {"id", "name", "description", "requires", "excludes", "level", "set", "multiply"}
+
+
+# The upgrade graph, loaded from assets/upgrades.json. Every upgrade lists
+# the upgrades it requires, the ones it can't be taken with, the first level
+# it can be offered at and its effects, Player fields to set or multiply. At
+# a level up the first UPGRADE_OFFERS upgrades, in file order, that are
+# available given what has been taken are offered. The file order sets the
+# selection keys, and is the one that gives levels 2 to 4 the same offers,
+# under the same keys, as the hand written cascade the tree replaced.
+#
+# Offers only depend on the upgrades taken and the level, and only up to the
+# highest level any upgrade asks for, so every state a game can reach is
+# walked once when the tree is loaded and offers() is a dictionary lookup.
+class UpgradeTree:
+    def __init__(self, upgrades):
+        problems = validate(upgrades)
+        if problems:
+            raise ValueError("invalid upgrade tree:\n  " + "\n  ".join(problems))
+        self.upgrades = {upgrade["id"]: upgrade for upgrade in upgrades}
+        self.order = upgrades
+        self.last_level = last_level(upgrades)
+        self.offer_table = reachable(upgrades)
+
+    @classmethod
+    def load(cls, path=UPGRADES_PATH):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def offers(self, level, taken):
+        # Options to show at a level up, each with its selection key
+        state = (min(level, self.last_level), frozenset(taken))
+        options = self.offer_table.get(state)
+        if options is None:
+            # Upgrades handed out outside the tree, e.g. by a benchmark
+            options = self.offer_table[state] = available(self.order, *state)
+        return options
+
+    def apply(self, upgrade_id, player):
+        upgrade = self.upgrades[upgrade_id]
+        for field, value in upgrade.get("set", {}).items():
+            setattr(player, field, value)
+        for field, factor in upgrade.get("multiply", {}).items():
+            setattr(player, field, getattr(player, field) * factor)
+
+
+def last_level(upgrades):
+    # Past this level the level no longer changes what is offered
+    return max([upgrade.get("level", 2) for upgrade in upgrades] + [2])
+
+
+def available(upgrades, level, taken):
+    # The options offered with `taken` already picked at `level`
+    options = []
+    for upgrade in upgrades:
+        upgrade_id = upgrade["id"]
+        if upgrade_id in taken or upgrade.get("level", 2) > level:
+            continue
+        if not taken.issuperset(upgrade.get("requires", ())) or not taken.isdisjoint(upgrade.get("excludes", ())):
+            continue
+        options.append({"id": upgrade_id, "name": upgrade["name"],
+                        "description": upgrade["description"], "key": str(len(options) + 1)})
+        if len(options) == UPGRADE_OFFERS:
+            break
+    return tuple(options)
+
+
+def reachable(upgrades):
+    # (level, upgrades taken) -> options, for every state a game can reach
+    # from its first level up. Levels past last_level share their entry.
+    final = last_level(upgrades)
+    table = {}
+    queue = deque([(2, frozenset())])
+    while queue:
+        state = queue.popleft()
+        if state in table:
+            continue
+        level, taken = state
+        options = table[state] = available(upgrades, level, taken)
+        next_level = min(level + 1, final)
+        if not options:
+            queue.append((next_level, taken))
+        for option in options:
+            queue.append((next_level, taken | {option["id"]}))
+    return table
+
+
+def validate(upgrades):
+    # Returns a list of problems with an upgrade list, empty when it is valid
+    if not isinstance(upgrades, list):
+        return ["the upgrade file must hold a list of upgrades"]
+    problems = []
+    ids = [upgrade.get("id") for upgrade in upgrades if isinstance(upgrade, dict)]
+    known = set(ids)
+    for i, upgrade in enumerate(upgrades):
+        if not isinstance(upgrade, dict):
+            problems.append(f"upgrade {i} is not an object")
+            continue
+        name = upgrade.get("id", f"upgrade {i}")
+        for key in ("id", "name", "description"):
+            if not isinstance(upgrade.get(key), str):
+                problems.append(f"{name}: {key} must be a string")
+        for key in upgrade.keys() - KEYS:
+            problems.append(f"{name}: unknown key {key!r}")
+        if ids.count(upgrade.get("id")) > 1:
+            problems.append(f"{name}: duplicate id")
+        if not isinstance(upgrade.get("level", 2), int) or upgrade.get("level", 2) < 2:
+            problems.append(f"{name}: level must be a whole number of at least 2")
+        requires = upgrade.get("requires", [])
+        excludes = upgrade.get("excludes", [])
+        for key, others in (("requires", requires), ("excludes", excludes)):
+            if not isinstance(others, list):
+                problems.append(f"{name}: {key} must be a list")
+                continue
+            for other in others:
+                if other not in known:
+                    problems.append(f"{name}: {key} unknown upgrade {other!r}")
+                elif other == upgrade.get("id"):
+                    problems.append(f"{name}: {key} itself")
+        if isinstance(requires, list) and isinstance(excludes, list):
+            for other in set(requires) & set(excludes):
+                problems.append(f"{name}: both requires and excludes {other!r}")
+        effects = 0
+        for op in ("set", "multiply"):
+            changes = upgrade.get(op, {})
+            if not isinstance(changes, dict):
+                problems.append(f"{name}: {op} must be an object")
+                continue
+            for field, value in changes.items():
+                effects += 1
+                if field not in PLAYER_FIELDS:
+                    problems.append(f"{name}: {op} unknown player field {field!r}")
+                elif op == "multiply" and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                           or PLAYER_FIELDS[field] is bool):
+                    problems.append(f"{name}: can't multiply {field} by {value!r}")
+                elif op == "set" and not isinstance(value, PLAYER_FIELDS[field]):
+                    problems.append(f"{name}: can't set {field} to {value!r}")
+        if not effects:
+            problems.append(f"{name}: has no effect")
+    if problems:
+        return problems
+
+    # Every upgrade has to be offered somewhere in the reachable tree
+    offered = set()
+    for options in reachable(upgrades).values():
+        offered.update(option["id"] for option in options)
+    for upgrade_id in ids:
+        if upgrade_id not in offered:
+            problems.append(f"{upgrade_id}: can never be offered")
+    return problems
+
+
+def main():
+    # python upgrades.py [FILE] checks an upgrade file and prints every
+    # state a game can reach with the options offered in it
+    path = sys.argv[1] if len(sys.argv) > 1 else UPGRADES_PATH
+    try:
+        tree = UpgradeTree.load(path)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    states = sorted(tree.offer_table.items(), key=lambda item: (item[0][0], len(item[0][1]), sorted(item[0][1])))
+    for (level, taken), options in states:
+        level_name = f"{level}+" if level == tree.last_level else str(level)
+        offered = ", ".join(option["name"] for option in options) or "nothing"
+        print(f"level {level_name:<4} taken [{', '.join(sorted(taken))}]: {offered}")
+    print(f"{len(tree.upgrades)} upgrades, {len(states)} reachable states, OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import time
+import pygame
+from asteroid import Asteroid
+from asteroidstore import ArrayAsteroid
+from shot import Shot, TrackingShot
+from pool import Pool
+from particles import Particles
+
+# Classes whose instances are recycled, by pool name
+POOLED = {"shot": Shot, "tracking_shot": TrackingShot, "asteroid": Asteroid}
+
+
+# One kind of entity, updated and drawn as a batch. Entities name the system
+# they belong to with a `system` class attribute and are registered with
+# World.add. Every system has the same update(dt, world) signature; the ones
+# whose entities need more than dt pull it from the world.
+class System:
+    def __init__(self, name):
+        self.name = name
+        self.group = pygame.sprite.Group()
+        self.update_time = 0.0  # seconds spent in update, summed
+        self.draw_time = 0.0
+
+    def __len__(self):
+        return len(self.group)
+
+    def add(self, entity):
+        entity.add(self.group)
+
+    def update(self, dt, world):
+        for entity in self.group:
+            entity.update(dt)
+
+    def draw(self, canvas, alpha):
+        for entity in self.group:
+            entity.draw(canvas, alpha)
+
+    def clear(self):
+        for entity in self.group:
+            entity.kill()
+
+
+class ShotSystem(System):
+    def update(self, dt, world):
+        # Tracking shots look up targets in the world's nearest asteroid index
+        targets = world.targets
+        for shot in self.group:
+            shot.update(dt, targets)
+
+
+class SpawnerSystem(System):
+    def update(self, dt, world):
+        for field in self.group:
+            field.update(dt, world.level)
+
+    def draw(self, canvas, alpha):
+        pass
+
+
+class ArrayAsteroidSystem(System):
+    # The array engine moves and draws the whole store at once. The group
+    # only holds the ArrayAsteroid handles for collisions and counting.
+    def __init__(self, name, store):
+        super().__init__(name)
+        self.store = store
+
+    def update(self, dt, world):
+        self.store.update(dt)
+
+    def draw(self, canvas, alpha):
+        self.store.draw(canvas, alpha)
+
+    def clear(self):
+        self.store.kill()
+        self.group.empty()
+
+
+class ParticleSystem(System):
+    # Explosions are particles in one ring, updated and drawn in a single
+    # pass each; the group stays empty
+    def __init__(self, name, particles):
+        super().__init__(name)
+        self.particles = particles
+
+    def __len__(self):
+        return len(self.particles)
+
+    def update(self, dt, world):
+        self.particles.update(dt)
+
+    def draw(self, canvas, alpha):
+        self.particles.draw(canvas)
+
+    def clear(self):
+        self.particles.clear()
+
+
+# Everything live in one game (or on the intro screen): the systems in update
+# and draw order, the pools its short lived objects are recycled through, and
+# the game wide settings the entity classes read. Entity classes look these up
+# through class attributes, so a world binds itself to them before anything is
+# spawned; more than one world can share a process as long as each is bound
+# while it runs.
+class World:
+    def __init__(self, pooling=True, sprite_cache=None, effects=True):
+        self.systems = {}
+        self.particles = Particles()
+        for system in (System("player"), System("asteroids"), ShotSystem("shots"),
+                       ParticleSystem("explosions", self.particles), SpawnerSystem("spawner")):
+            self.systems[system.name] = system
+        self.pools = {name: Pool(cls) for name, cls in POOLED.items()} if pooling else {}
+        self.sprite_cache = sprite_cache  # AsteroidSpriteCache, None draws exact polygons
+        self.effects = effects  # explosions are only created when set
+        self.asteroid_store = None
+        self.level = 1  # sets asteroid speed
+        self.targets = None  # nearest asteroid index for tracking shots
+        self.profiler = None  # Profiler the per-system times are also reported to
+
+    def __getitem__(self, name):
+        return self.systems[name].group
+
+    def bind(self):
+        for name, cls in POOLED.items():
+            cls.pool = self.pools.get(name)
+        Asteroid.world = ArrayAsteroid.world = self
+        Asteroid.sprite_cache = self.sprite_cache
+        ArrayAsteroid.store = self.asteroid_store
+
+    def use_asteroid_store(self, store):
+        # Switches the asteroids system to the array engine
+        self.asteroid_store = store
+        self.systems["asteroids"] = ArrayAsteroidSystem("asteroids", store)
+        ArrayAsteroid.store = store
+
+    def add(self, entity):
+        self.systems[entity.system].add(entity)
+
+    def explode(self, position, radius, rng):
+        # Purely cosmetic, nothing is emitted with effects off
+        if self.effects:
+            self.particles.emit(position[0], position[1], radius, rng)
+
+    def clear(self):
+        # Kills everything, returning pooled objects to this world's pools
+        self.bind()
+        for system in self.systems.values():
+            system.clear()
+        if self.asteroid_store is not None:
+            self.asteroid_store = None
+            self.systems["asteroids"] = System("asteroids")
+        for pool in self.pools.values():
+            pool.flush()
+
+    def update(self, dt):
+        self.bind()
+        profiler = self.profiler if self.profiler is not None and self.profiler.enabled else None
+        for system in self.systems.values():
+            start = time.perf_counter()
+            system.update(dt, self)
+            elapsed = time.perf_counter() - start
+            system.update_time += elapsed
+            if profiler is not None:
+                profiler.add("update_" + system.name, elapsed)
+        # Objects killed this step can be reused from the next one on
+        for pool in self.pools.values():
+            pool.flush()
+
+    def draw(self, canvas, alpha=1.0):
+        # Draws onto a Canvas; nothing reaches the screen before canvas.finish()
+        self.bind()
+        profiler = self.profiler if self.profiler is not None and self.profiler.enabled else None
+        for system in self.systems.values():
+            start = time.perf_counter()
+            system.draw(canvas, alpha)
+            elapsed = time.perf_counter() - start
+            system.draw_time += elapsed
+            if profiler is not None:
+                profiler.add("draw_" + system.name, elapsed)
+
+    def counts(self):
+        return {name: len(system) for name, system in self.systems.items()}
+
+    def timings(self):
+        return {name: {"entities": len(system), "update": system.update_time, "draw": system.draw_time}
+                for name, system in self.systems.items()}